@@ -1,46 +1,245 @@
+"""Enrôlement MFA par lots : décode les QR codes otpauth:// d'un répertoire.
+
+Les images sont décodées en parallèle (un processus par cœur), après passage
+en niveaux de gris et réduction à ``QR_MAX_SIDE`` pixels. Chaque URI est lue
+avec ``pyotp.parse_uri`` et enregistrée dans la table locale des secrets OTP
+(``OTP_SECRETS_PATH``, fichier 0600), indexée par ``issuer:compte``. C'est
+cette table que clientSecret.py utilise pour la connexion quand
+``AMAZON_OTP_SECRET`` n'est pas défini.
+
+Les résultats sont mis en cache par hash de fichier : une nouvelle exécution
+sur le même répertoire ne décode que les images nouvelles ou modifiées.
+
+    python QRCODE.py ./qrcodes
+    python QRCODE.py ./qrcodes --workers 8 --max-side 800
+    python QRCODE.py --list
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 
 import cv2
-from pyotp import otp
-from pyzbar.pyzbar import decode
 import pyotp
-from datetime import datetime
+from dotenv import load_dotenv
+
+try:
+    from pyzbar.pyzbar import decode as zbar_decode
+except ImportError:  # pyzbar ou la bibliothèque zbar absents : décodeur QR d'OpenCV
+    zbar_decode = None
+
+load_dotenv()
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OTP_SECRETS_PATH = os.getenv('OTP_SECRETS_PATH') or os.path.join(HERE, 'otp_secrets.json')
+QR_CACHE_PATH = os.getenv('QR_CACHE_PATH') or os.path.join(HERE, '.qrcode_cache.json')
+QR_MAX_SIDE = int(os.getenv('QR_MAX_SIDE', '1000'))  # Côté maximal de l'image décodée (pixels)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp')
+
+logging.basicConfig(level=logging.INFO)
+INFO = logging.info
+ERROR = logging.error
+WARNING = logging.warning
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def preprocess(image, max_side=None):
+    """Niveaux de gris puis réduction : un QR code reste lisible et le décodage est bien plus rapide."""
+    max_side = QR_MAX_SIDE if max_side is None else max_side
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = image.shape[:2]
+    if max_side and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        image = cv2.resize(image, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    return image
+
+
+def decode_qr(image):
+    """Textes des QR codes de l'image (pyzbar si disponible, sinon OpenCV)."""
+    if zbar_decode is not None:
+        return [symbol.data.decode('utf-8') for symbol in zbar_decode(image)]
+    found, texts, _points, _codes = cv2.QRCodeDetector().detectAndDecodeMulti(image)
+    return [text for text in texts if text] if found else []
+
+
+def decode_file(file_path, max_side=None, preprocessing=True):
+    """Décode une image (exécuté dans un processus du pool) ; retourne (chemin, URIs, erreur)."""
+    image = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE if preprocessing else cv2.IMREAD_COLOR)
+    if image is None:
+        return file_path, [], "unreadable image"
+    try:
+        if not preprocessing:
+            return file_path, decode_qr(image), None
+        reduced = preprocess(image, max_side)
+        texts = decode_qr(reduced)
+        if not texts and reduced.shape != image.shape:
+            texts = decode_qr(image)  # QR code trop petit pour la réduction : on réessaie en pleine résolution
+        return file_path, texts, None
+    except cv2.error as e:
+        return file_path, [], str(e)
+
+
+def secret_key(otp):
+    """Clé de la table des secrets : ``issuer:compte`` (le compte seul sans émetteur)."""
+    return f"{otp.issuer}:{otp.name}" if otp.issuer else str(otp.name)
+
+
+def parse_otpauth(uri):
+    """Lit une URI otpauth:// ; retourne (clé, entrée de la table) ou None si ce n'est pas un TOTP valide."""
+    try:
+        otp = pyotp.parse_uri(uri)
+    except ValueError as e:
+        WARNING(f"Not an otpauth URI: {e}")
+        return None
+    if not isinstance(otp, pyotp.TOTP):
+        WARNING(f"Ignoring non-TOTP code for {otp.name}")
+        return None
+    return secret_key(otp), {'issuer': otp.issuer, 'account': otp.name, 'uri': uri}
+
+
+def load_json(path, default):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        WARNING(f"Ignoring unreadable file {path}: {e}")
+        return default
+
+
+def write_private_json(path, data):
+    """Écriture atomique d'un fichier lisible par le seul propriétaire (0600)."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def load_secrets(path=None):
+    """Table des secrets OTP : clé ``issuer:compte`` -> {issuer, account, uri, source, sha256, enrolled_at}."""
+    return load_json(path or OTP_SECRETS_PATH, {}).get('secrets', {})
+
 
-# Charger l'image contenant le code QR
-image = cv2.imread(r'C:\Users\ayman\OneDrive\Bureau\Virtuo Code\Etail\Script_client_SectretKey\AuthAmazonQRCode.png')
+def list_images(directory):
+    images = []
+    for root, _dirs, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(os.path.join(root, name))
+    return images
 
-decoded_objects = decode(image)
-print(decoded_objects)
 
-if decoded_objects:
-    qr_data = decoded_objects[0].data.decode('utf-8')
-    print(qr_data)
+def scan_directory(directory, secrets_path=None, cache_path=None, workers=None, max_side=None, preprocessing=True):
+    """Décode les QR codes du répertoire et met à jour la table des secrets ; retourne des statistiques.
 
-    # Afficher le contenu du code QRpip install opencv-python
-    print("OTP code was generated successfully...")
+    Le cache (``QR_CACHE_PATH``) associe le hash de chaque image aux clés
+    qu'elle contient et ne contient aucun secret. Une image dont le hash est
+    connu, et dont les clés sont présentes dans la table, n'est pas redécodée.
+    """
+    secrets_path = secrets_path or OTP_SECRETS_PATH
+    cache_path = QR_CACHE_PATH if cache_path is None else cache_path
+    secrets = load_secrets(secrets_path)
+    cache = load_json(cache_path, {}) if cache_path else {}
+    files_index = cache.setdefault('files', {})  # chemin -> [mtime_ns, taille, sha256]
+    hashes = cache.setdefault('hashes', {})  # sha256 -> clés de la table
 
-else:
-    print("no qr")
+    stats = {'images': 0, 'cached': 0, 'decoded': 0, 'no_qr': 0, 'errors': 0, 'enrolled': 0}
+    to_decode = {}
+    for file_path in list_images(directory):
+        stats['images'] += 1
+        stat = os.stat(file_path)
+        known = files_index.get(file_path)
+        sha256 = known[2] if known and known[:2] == [stat.st_mtime_ns, stat.st_size] else file_sha256(file_path)
+        files_index[file_path] = [stat.st_mtime_ns, stat.st_size, sha256]
+        keys = hashes.get(sha256)
+        if keys is not None and all(key in secrets for key in keys):
+            stats['cached'] += 1
+            continue
+        to_decode[file_path] = sha256
 
-otpauth_url = "otpauth://totp/Amazon%3Adev%40etail-agency.com?secret=N6ROBUP7P2YHKZQOVKJDB3YLCSVCUMWOHSR2PZOQPLOAMFB37ASQ&issuer=Amazon"
-print(otpauth_url)
+    if to_decode:
+        workers = workers or os.cpu_count() or 1
+        INFO(f"Decoding {len(to_decode)} image(s) with {workers} process(es)...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            count = len(to_decode)
+            decoded = executor.map(decode_file, list(to_decode), [max_side] * count, [preprocessing] * count,
+                                   chunksize=max(1, count // (workers * 4)))
+            for file_path, texts, error in decoded:
+                if error:
+                    stats['errors'] += 1
+                    ERROR(f"{file_path}: {error}")
+                    continue
+                stats['decoded'] += 1
+                keys = []
+                for text in texts:
+                    parsed = parse_otpauth(text)
+                    if parsed is None:
+                        continue
+                    key, entry = parsed
+                    secrets[key] = {**entry, 'source': os.path.basename(file_path), 'sha256': to_decode[file_path],
+                                    'enrolled_at': datetime.now().isoformat(timespec='seconds')}
+                    keys.append(key)
+                    stats['enrolled'] += 1
+                    INFO(f"Enrolled {key} from {os.path.basename(file_path)}")
+                if not keys:
+                    stats['no_qr'] += 1
+                    WARNING(f"No otpauth QR code found in {file_path}")
+                hashes[to_decode[file_path]] = keys
 
+    write_private_json(secrets_path, {'version': 1, 'secrets': secrets})
+    if cache_path:
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            WARNING(f"Could not write QR cache {cache_path}: {e}")
+    return stats
 
-def generate(code):
-    otp_data = pyotp.parse_uri(code)
-    totp = pyotp.TOTP(otp_data.secret)
-    otp_code = totp.now()
-    return(otp_code )
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Décode les QR codes MFA d'un répertoire et enregistre les secrets OTP.")
+    parser.add_argument('directory', nargs='?', help="répertoire des images de QR codes (parcouru récursivement)")
+    parser.add_argument('--output', default=OTP_SECRETS_PATH, help="table des secrets OTP (par défaut OTP_SECRETS_PATH)")
+    parser.add_argument('--workers', type=int, help="nombre de processus de décodage (par défaut : nombre de cœurs)")
+    parser.add_argument('--max-side', type=int, default=QR_MAX_SIDE, help="côté maximal des images réduites (0 : pas de réduction)")
+    parser.add_argument('--no-cache', action='store_true', help="redécode toutes les images")
+    parser.add_argument('--list', action='store_true', help="liste les clés enrôlées (sans les secrets) et leur code courant")
+    return parser.parse_args(argv)
 
-# storing the current time in the variable
-c = datetime.now()
 
-# Displays Time
-current_time = c.strftime('%H:%M:%S')
-print('Current Time is:', current_time)
-# OR
-# Displays Date along with Time
-print('Current Date and Time is:', c)
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list:
+        for key, entry in sorted(load_secrets(args.output).items()):
+            print(f"{key}\t{entry.get('source')}\t{pyotp.parse_uri(entry['uri']).now()}")
+        return
+    if not args.directory:
+        ERROR("No directory given (see --help).")
+        return
 
+    start = time.perf_counter()
+    stats = scan_directory(args.directory, secrets_path=args.output, cache_path='' if args.no_cache else None,
+                           workers=args.workers, max_side=args.max_side)
+    elapsed = time.perf_counter() - start
+    INFO(f"{stats['images']} image(s) in {elapsed:.2f}s: {stats['cached']} from cache, {stats['decoded']} decoded, "
+         f"{stats['enrolled']} secret(s) enrolled, {stats['no_qr']} without QR code, {stats['errors']} error(s). "
+         f"Secrets written to {args.output}")
 
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark de bout en bout : clientSecret.main() contre le faux Vendor Central local.
+
+Démarre benchmarks/mock_vendorcentral.py, génère la liste des comptes, lance
+main() en Chrome headless et affiche le débit (comptes/minute), la latence par
+étape (p50/p95 et allers-retours WebDriver, d'après les spans), le temps passé
+dans le moteur d'attente et la mémoire maximale des navigateurs. Fonctionne
+hors ligne dès que chromedriver est disponible localement (CHROME_DRIVER_PATH
+ou cache .chromedriver.json).
+
+    python benchmarks/bench_end_to_end.py --accounts 30 --workers 2 --latency 0.1 --failure-rate 0.02
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from mock_vendorcentral import DEFAULT_OTP_SECRET, MockVendorCentral, start_server  # noqa: E402
+
+try:
+    import psutil
+except ImportError:  # La mémoire des navigateurs n'est alors pas mesurée
+    psutil = None
+
+
+class BrowserMemorySampler(threading.Thread):
+    """Échantillonne la RSS cumulée des processus enfants (chromedriver + Chrome) du benchmark."""
+
+    def __init__(self, interval=0.5):
+        super().__init__(name='memory-sampler', daemon=True)
+        self.interval = interval
+        self.peak_rss = 0
+        self.stop_event = threading.Event()
+
+    def run(self):
+        current = psutil.Process()
+        while not self.stop_event.wait(self.interval):
+            rss = 0
+            for child in current.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.peak_rss = max(self.peak_rss, rss)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+def configure_environment(base_url, workdir, accounts_csv, args):
+    """Variables lues par clientSecret.py à l'import : à définir avant de l'importer."""
+    os.environ.update({
+        'VENDOR_CENTRAL_URL': base_url,
+        'EXCEL_FILE_PATH': accounts_csv,
+        'REPORT_PATH': workdir,
+        'AMAZON_EMAIL': 'benchmark@example.com',
+        'AMAZON_PASSWORD': 'benchmark',
+        'AMAZON_OTP_SECRET': DEFAULT_OTP_SECRET,
+        'WORKER_COUNT': str(args.workers),
+        'MAX_CONCURRENT_LOGINS': str(args.workers),
+        'BROWSER_PROFILE': args.profile,
+        'FAST_MODE': '1',
+        'STATE_DB_PATH': os.path.join(workdir, 'state.sqlite3'),
+        'ACCOUNTS_CACHE_PATH': os.path.join(workdir, 'accounts_cache.json'),
+    })
+    os.environ.pop('SESSION_CACHE_PATH', None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=20)
+    parser.add_argument('--apps-per-account', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.05, help="latence par requête du faux serveur (secondes)")
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--profile-alert-rate', type=float, default=0.0)
+    parser.add_argument('--profile', choices=('lean', 'standard'), default='lean')
+    args = parser.parse_args()
+
+    mock = MockVendorCentral(
+        accounts=args.accounts, apps_per_account=args.apps_per_account, latency=args.latency,
+        failure_rate=args.failure_rate, profile_alert_rate=args.profile_alert_rate,
+    )
+    server, base_url = start_server(mock)
+    workdir = tempfile.mkdtemp(prefix='bench_e2e_')
+    accounts_csv = os.path.join(workdir, 'accounts.csv')
+    mock.write_accounts_csv(accounts_csv)
+    configure_environment(base_url, workdir, accounts_csv, args)
+
+    import clientSecret
+
+    sampler = BrowserMemorySampler() if psutil else None
+    if sampler:
+        sampler.start()
+    start = time.monotonic()
+    try:
+        clientSecret.main(['--check-all'])
+    finally:
+        elapsed = time.monotonic() - start
+        if sampler:
+            sampler.stop()
+        server.shutdown()
+
+    print()
+    print(f"Mock server     : {base_url} ({mock.stats['requests']} requests, "
+          f"{mock.stats['failures_injected']} failures injected, {mock.stats['renewals']} renewals)")
+    print(f"Accounts        : {args.accounts} with {args.workers} worker(s), {args.profile} profile")
+    print(f"Wall time       : {elapsed:.1f}s")
+    print(f"Throughput      : {args.accounts / elapsed * 60:.1f} accounts/minute")
+    if sampler:
+        print(f"Peak browser RSS: {sampler.peak_rss / 1024 / 1024:.0f} MiB")
+    else:
+        print("Peak browser RSS: psutil not installed")
+    memory = clientSecret.summarize_memory()
+    print(f"Browser recycles: {memory['recycles']} ({memory['relogins']} with re-login), "
+          f"first accounts {memory['first_accounts_mean_s'] or 0:.2f}s vs last {memory['last_accounts_mean_s'] or 0:.2f}s")
+
+    print()
+    print(f"{'step':<18}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'total s':>9}{'round-trips':>13}{'failures':>10}")
+    for step, stats in clientSecret.summarize_spans().items():
+        print(f"{step:<18}{stats['count']:>7}{stats['p50'] * 1000:>9.0f}{stats['p95'] * 1000:>9.0f}"
+              f"{stats['total']:>9.1f}{stats['round_trips']:>13}{stats['failures']:>10}")
+
+    modal_trips = sum(stats['round_trips'] for step, stats in clientSecret.summarize_spans().items()
+                      if step in ('modal_open', 'extraction'))
+    print(f"Modal round-trips per account (open + extraction): {modal_trips / max(1, args.accounts):.1f}")
+
+    print()
+    print(f"{'wait':<18}{'waits':>7}{'mean ms':>10}{'total s':>9}")
+    for step, (count, waited, _legacy) in sorted(clientSecret.WAIT_STATS.items()):
+        print(f"{step:<18}{count:>7}{waited / count * 1000:>10.0f}{waited:>9.1f}")
+    print(f"\nReports and journal in {workdir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark de QRCODE.py : débit d'enrôlement sur un lot de QR codes générés.
+
+Génère N images de QR codes otpauth:// (agrandies et entourées de marges, à la
+manière de captures d'écran), puis compare, en images/seconde :
+
+* naive        : image couleur en pleine résolution, un seul processus
+* preprocessed : niveaux de gris + réduction, un seul processus
+* pooled       : niveaux de gris + réduction, pool de processus
+* cached       : nouvelle exécution sur le même répertoire (cache par hash)
+
+    python benchmarks/bench_qrcode.py --images 300 --size 2400
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+import pyotp  # noqa: E402
+
+import QRCODE  # noqa: E402
+
+
+def generate_images(directory, count, size):
+    """Écrit ``count`` QR codes TOTP distincts en PNG de ``size`` pixels de côté."""
+    encoder = cv2.QRCodeEncoder.create()
+    for index in range(count):
+        uri = pyotp.TOTP(pyotp.random_base32()).provisioning_uri(
+            name=f"vendor{index:04d}@example.com", issuer_name='Amazon')
+        code = encoder.encode(uri)
+        side = size * 2 // 3
+        code = cv2.resize(code, (side, side), interpolation=cv2.INTER_NEAREST)
+        image = np.full((size, size, 3), 255, dtype=np.uint8)
+        offset = (size - side) // 2
+        image[offset:offset + side, offset:offset + side] = code[:, :, None]
+        cv2.imwrite(os.path.join(directory, f"qr_{index:04d}.png"), image)
+
+
+def run(label, directory, workdir, count, **kwargs):
+    secrets_path = os.path.join(workdir, f"{label}.json")
+    start = time.perf_counter()
+    stats = QRCODE.scan_directory(directory, secrets_path=secrets_path, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14}{elapsed:>9.2f}{count / elapsed:>12.1f}{stats['enrolled']:>10}{stats['cached']:>8}")
+    return secrets_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=300)
+    parser.add_argument('--size', type=int, default=2400, help="côté des images générées (pixels)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)  # Un message par image fausserait la mesure
+
+    workdir = tempfile.mkdtemp(prefix='bench_qrcode_')
+    directory = os.path.join(workdir, 'images')
+    os.makedirs(directory)
+    start = time.perf_counter()
+    generate_images(directory, args.images, args.size)
+    print(f"Generated {args.images} images of {args.size}px in {time.perf_counter() - start:.1f}s "
+          f"(decoder: {'pyzbar' if QRCODE.zbar_decode else 'OpenCV'})")
+
+    print()
+    print(f"{'mode':<14}{'wall s':>9}{'images/s':>12}{'enrolled':>10}{'cached':>8}")
+    run('naive', directory, workdir, args.images, cache_path='', workers=1, preprocessing=False)
+    run('preprocessed', directory, workdir, args.images, cache_path='', workers=1)
+    cache_path = os.path.join(workdir, 'cache.json')
+    secrets_path = run('pooled', directory, workdir, args.images, cache_path=cache_path, workers=args.workers)
+    start = time.perf_counter()
+    stats = QRCODE.scan_directory(directory, secrets_path=secrets_path, cache_path=cache_path, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{'cached':<14}{elapsed:>9.2f}{args.images / elapsed:>12.1f}{stats['enrolled']:>10}{stats['cached']:>8}")
+    print(f"\nImages and secret maps in {workdir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Micro-benchmark du chargement de la liste des comptes.
+
+Compare l'ancien chemin pandas (``pd.read_excel(usecols='A,C')``) avec le
+chargeur openpyxl en lecture seule, à froid puis depuis le cache, et mesure
+le coût d'import de chaque bibliothèque dans un processus séparé.
+
+    python benchmarks/bench_read_accounts.py [listAccount_sorted.xlsx] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('REPORT_PATH', tempfile.gettempdir())
+
+import clientSecret  # noqa: E402
+
+
+def time_calls(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def import_time(module):
+    """Durée d'import d'un module dans un interpréteur neuf."""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    return float(output.stdout) if output.returncode == 0 else None
+
+
+def pandas_loader(file_path):
+    import pandas as pd
+    return pd.read_excel(file_path, usecols='A,C', names=['AccountName', 'ClientID']).to_dict('records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('file', nargs='?', default=os.path.join(ROOT, 'listAccount_sorted.xlsx'))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cache_path = os.path.join(tempfile.mkdtemp(), 'accounts_cache.json')
+    scenarios = {
+        'openpyxl (no cache)': lambda: clientSecret.read_accounts_from_excel(args.file, cache_path=''),
+        'openpyxl (cached)': lambda: clientSecret.read_accounts_from_excel(args.file, cache_path=cache_path),
+    }
+    try:
+        import pandas  # noqa: F401
+        scenarios = {'pandas': lambda: pandas_loader(args.file), **scenarios}
+    except ImportError:
+        print("pandas not installed: legacy path skipped")
+
+    clientSecret.read_accounts_from_excel(args.file, cache_path=cache_path)  # Amorcer le cache
+    print(f"{'loader':<22}{'rows':>6}{'mean ms':>10}{'median ms':>11}")
+    for name, loader in scenarios.items():
+        timings, rows = time_calls(loader, args.repeat)
+        print(f"{name:<22}{len(rows):>6}{statistics.mean(timings) * 1000:>10.1f}{statistics.median(timings) * 1000:>11.1f}")
+
+    for module in ('pandas', 'openpyxl'):
+        seconds = import_time(module)
+        print(f"import {module:<15}" + (f"{seconds * 1000:>10.1f} ms" if seconds is not None else "  not installed"))
+
+
+if __name__ == '__main__':
+    main()
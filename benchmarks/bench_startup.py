@@ -0,0 +1,87 @@
+"""Benchmark du démarrage de clientSecret.py : temps de --help, --dry-run et coût des imports.
+
+Chaque commande est lancée dans un nouvel interpréteur (plusieurs fois, on
+garde la médiane), sur une liste de comptes générée. L'import du module est
+ensuite profilé avec ``python -X importtime`` : le tableau liste les modules
+les plus coûteux (temps cumulé) et signale si Selenium, webdriver_manager,
+ou openpyxl sont chargés alors qu'aucun navigateur n'est démarré.
+
+    python benchmarks/bench_startup.py --repeats 5 --accounts 200
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+SCRIPT = os.path.join(ROOT, 'clientSecret.py')
+
+from mock_vendorcentral import MockVendorCentral  # noqa: E402
+
+HEAVY_MODULES = ('selenium.webdriver', 'webdriver_manager', 'openpyxl')
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def timed_run(command, env, repeats):
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def import_profile(env):
+    """Modules importés par ``import clientSecret`` : nom -> (temps propre, temps cumulé) en microsecondes."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import clientSecret'], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match[4]] = (int(match[1]), int(match[2]))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument('--top', type=int, default=12, help="nombre de modules affichés")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    accounts_csv = os.path.join(workdir, 'accounts.csv')
+    MockVendorCentral(accounts=args.accounts).write_accounts_csv(accounts_csv)
+    env = {**os.environ, 'REPORT_PATH': workdir, 'EXCEL_FILE_PATH': accounts_csv,
+           'STATE_DB_PATH': os.path.join(workdir, 'state.sqlite3'),
+           'ACCOUNTS_CACHE_PATH': os.path.join(workdir, 'accounts_cache.json')}
+
+    commands = [
+        ('python -c pass', [sys.executable, '-c', 'pass']),
+        ('--help', [sys.executable, SCRIPT, '--help']),
+        ('--dry-run', [sys.executable, SCRIPT, '--dry-run']),
+        ('--dry-run --limit 5', [sys.executable, SCRIPT, '--dry-run', '--limit', '5']),
+    ]
+    print(f"{'command':<24}{'median s':>10}")
+    for label, command in commands:
+        print(f"{label:<24}{timed_run(command, env, args.repeats):>10.3f}")
+
+    modules = import_profile(env)
+    total = modules.get('clientSecret', (0, 0))[1]
+    print()
+    print(f"import clientSecret: {total / 1000:.1f} ms cumulative, {len(modules)} modules")
+    print(f"{'module':<44}{'self ms':>9}{'cumul ms':>10}")
+    for name, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{name:<44}{own / 1000:>9.1f}{cumulative / 1000:>10.1f}")
+    loaded = [name for name in HEAVY_MODULES if name in modules]
+    print(f"\nHeavy modules loaded at import: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == '__main__':
+    main()
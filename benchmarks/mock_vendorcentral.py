@@ -0,0 +1,450 @@
+"""Serveur local qui imite les pages Vendor Central utilisées par clientSecret.py.
+
+Pages servies (mêmes IDs, classes et XPath que le site réel) :
+- connexion : /ap/signin (ap_email, ap_password) puis /ap/mfa (auth-mfa-otpcode) ;
+- sélecteur de comptes : /account-switcher/regional/vendorGroup ;
+- console développeur : /sellingpartner/developerconsole (tableau applicationTableBody) ;
+- modal kat-modal / kat-expander en shadow DOM avec la clé secrète, son
+  expiration et les boutons renouveler / confirmer / terminer.
+
+Latence, nombre de comptes et injection de pannes sont configurables :
+
+    python benchmarks/mock_vendorcentral.py --port 8080 --accounts 50 --latency 0.2 --failure-rate 0.05
+
+Les comptes générés sont écrits en CSV (--accounts-csv) pour servir de liste
+de comptes à clientSecret.py (EXCEL_FILE_PATH accepte un CSV).
+"""
+import argparse
+import csv
+import hashlib
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import pyotp
+except ImportError:  # La vérification du code OTP est alors désactivée
+    pyotp = None
+
+DEFAULT_OTP_SECRET = 'JBSWY3DPEHPK3PXP'
+PROFILE_ALERT_TEXT = 'You need to complete your Developer Profile'
+
+COMPONENTS_JS = """
+customElements.define('kat-modal', class extends HTMLElement {
+    constructor() {
+        super();
+        var root = this.attachShadow({mode: 'open'});
+        root.innerHTML = '<button class="close" aria-label="Close">&times;</button><slot></slot>';
+        root.querySelector('button.close').addEventListener('click', () => this.remove());
+    }
+});
+customElements.define('kat-expander', class extends HTMLElement {
+    constructor() {
+        super();
+        var root = this.attachShadow({mode: 'open'});
+        root.innerHTML = '<div class="wrapper"><button><div class="header__toggle">'
+            + '<slot name="toggle"><kat-icon name="chevron-down">&#9660;</kat-icon></slot>'
+            + '</div></button><div class="content" hidden><slot></slot></div></div>';
+        root.querySelector('button').addEventListener('click', () => {
+            var content = root.querySelector('.content');
+            content.hidden = !content.hidden;
+            this.toggleAttribute('expanded', !content.hidden);
+        });
+    }
+});
+"""
+
+STYLE = """
+kat-tabs, kat-tab, kat-table, kat-table-body, kat-table-row, kat-modal, kat-expander { display: block; }
+kat-table-cell, kat-link, kat-button, kat-icon, kat-input { display: inline-block; margin: 0 4px; }
+kat-link, kat-button { cursor: pointer; text-decoration: underline; }
+kat-modal { position: fixed; top: 10%; left: 10%; width: 80%; background: #fff; border: 1px solid #888; padding: 1em; }
+.hidden { display: none; }
+"""
+
+CONSOLE_JS = """
+function openApplication(row) {
+    fetch('/api/applications/' + row).then(function (response) {
+        if (!response.ok) { throw new Error('HTTP ' + response.status); }
+        return response.json();
+    }).then(function (app) {
+        var existing = document.querySelector('kat-modal');
+        if (existing) { existing.remove(); }
+        var modal = document.createElement('kat-modal');
+        modal.setAttribute('role', 'dialog');
+        modal.setAttribute('aria-modal', 'true');
+        modal.setAttribute('visible', 'true');
+        modal.innerHTML = '<div class="header"><h3></h3><input id="clientIdInput" readonly></div>'
+            + '<span><kat-expander>'
+            + '<div class="clientSecretDiv"><kat-input type="password"></kat-input></div>'
+            + '<span><div><i class="expiration"></i></div></span>'
+            + '</kat-expander></span>'
+            + '<div class="footer">'
+            + '<kat-button class="footerLeftButton" variant="primary">Renew secret</kat-button>'
+            + '<kat-button class="footerConfirmationButton hidden" variant="primary">Confirm</kat-button>'
+            + '<kat-button class="footerRightButton hidden" variant="secondary">Done</kat-button>'
+            + '</div>';
+        document.body.appendChild(modal);
+        fillModal(modal, app);
+        modal.querySelector('.footerLeftButton').addEventListener('click', function () {
+            modal.querySelector('.footerConfirmationButton').classList.remove('hidden');
+        });
+        modal.querySelector('.footerConfirmationButton').addEventListener('click', function () {
+            this.classList.add('hidden');
+            fetch('/api/applications/' + row + '/renew', {method: 'POST'}).then(function (response) {
+                return response.json();
+            }).then(function (renewed) {
+                fillModal(modal, renewed);
+                modal.querySelector('.footerRightButton').classList.remove('hidden');
+            });
+        });
+        modal.querySelector('.footerRightButton').addEventListener('click', function () {
+            this.classList.add('hidden');
+        });
+    }).catch(function (error) { console.error('Modal failed to open', error); });
+}
+function fillModal(modal, app) {
+    modal.querySelector('h3').textContent = app.name;
+    modal.querySelector('#clientIdInput').value = app.clientId;
+    modal.querySelector('.clientSecretDiv kat-input').setAttribute('value', app.clientSecret);
+    modal.querySelector('i.expiration').textContent = 'Client secret expires: ' + app.expiresAt;
+}
+document.querySelectorAll('kat-link[data-row]').forEach(function (link) {
+    link.addEventListener('click', function () { openApplication(link.dataset.row); });
+});
+"""
+
+SWITCHER_JS = """
+var selected = null;
+setTimeout(function () {
+    var container = document.querySelector('.full-page-account-switcher-accounts');
+    ACCOUNTS.forEach(function (name, index) {
+        var entry = document.createElement('div');
+        entry.className = 'full-page-account-switcher-account';
+        entry.innerHTML = '<span class="full-page-account-switcher-account-label"></span>'
+            + '<div class="full-page-account-switcher-account-details">Select</div>';
+        entry.querySelector('.full-page-account-switcher-account-label').textContent = name;
+        entry.querySelector('.full-page-account-switcher-account-details').addEventListener('click', function () {
+            selected = index;
+            document.querySelectorAll('.full-page-account-switcher-account.selected').forEach(function (other) {
+                other.classList.remove('selected');
+            });
+            entry.classList.add('selected');
+        });
+        container.appendChild(entry);
+    });
+}, RENDER_DELAY_MS);
+document.querySelector('button.kat-button--primary').addEventListener('click', function () {
+    if (selected !== null) { location.href = '/account-switcher/select?index=' + selected; }
+});
+"""
+
+
+def page(title, body, script=''):
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+        f"<style>{STYLE}</style><script>{COMPONENTS_JS}</script></head>"
+        f"<body>{body}<script>{script}</script></body></html>"
+    )
+
+
+class MockVendorCentral:
+    """État du faux Vendor Central : comptes, applications, sessions et paramètres de simulation."""
+
+    def __init__(self, accounts=20, apps_per_account=3, latency=0.0, render_delay=None, failure_rate=0.0,
+                 profile_alert_rate=0.0, otp_secret=DEFAULT_OTP_SECRET, ids_in_table=False, seed=42):
+        self.latency = latency
+        self.render_delay = latency if render_delay is None else render_delay
+        self.failure_rate = failure_rate
+        self.otp_secret = otp_secret
+        self.ids_in_table = ids_in_table
+        self.random = random.Random(seed)
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'failures_injected': 0, 'renewals': 0}
+        self.accounts = []
+        today = datetime.now().replace(microsecond=0)
+        for index in range(accounts):
+            apps = []
+            for app_index in range(apps_per_account):
+                digest = hashlib.md5(f"{seed}-{index}-{app_index}".encode()).hexdigest()
+                apps.append({
+                    'name': f"Integration {index:03d}-{app_index}",
+                    'clientId': f"amzn1.application-oa2-client.{digest}",
+                    'clientSecret': self.new_secret(),
+                    'expiresAt': (today + timedelta(days=self.random.randint(-5, 400))).isoformat(),
+                })
+            self.accounts.append({
+                'name': f"FR - Mock Vendor {index:03d} - FR - Grocery - (Pan-EU)",
+                'apps': apps,
+                'target': self.random.randrange(apps_per_account),
+                'profile_alert': self.random.random() < profile_alert_rate,
+            })
+
+    def new_secret(self):
+        return f"amzn1.oa2-cs.v1.{secrets.token_hex(32)}"
+
+    def account_list(self):
+        """Liste (nom du compte, ClientID de l'application cible) dans l'ordre du sélecteur."""
+        return [(account['name'], account['apps'][account['target']]['clientId']) for account in self.accounts]
+
+    def write_accounts_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['AccountName', 'ClientID'])
+            writer.writerows(self.account_list())
+
+    def verify_otp(self, code):
+        if pyotp is None:
+            return code.isdigit() and len(code) == 6
+        return pyotp.TOTP(self.otp_secret).verify(code, valid_window=1)
+
+    def should_fail(self):
+        with self.lock:
+            failed = self.random.random() < self.failure_rate
+            if failed:
+                self.stats['failures_injected'] += 1
+            return failed
+
+    def renew(self, app):
+        with self.lock:
+            app['clientSecret'] = self.new_secret()
+            app['expiresAt'] = (datetime.now().replace(microsecond=0) + timedelta(days=365)).isoformat()
+            self.stats['renewals'] += 1
+        return app
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = 'MockVendorCentral/1.0'
+
+    @property
+    def mock(self):
+        return self.server.mock
+
+    def log_message(self, format, *args):
+        pass  # Silencieux : le benchmark mesure, il ne journalise pas chaque requête
+
+    def cookies(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        return {key: morsel.value for key, morsel in cookie.items()}
+
+    def logged_in(self):
+        return self.cookies().get('vc-session') in self.mock.sessions
+
+    def current_account(self):
+        try:
+            return self.mock.accounts[int(self.cookies().get('vc-account', ''))]
+        except (ValueError, IndexError):
+            return None
+
+    def send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_json(self, status, data):
+        self.send(status, json.dumps(data), 'application/json')
+
+    def redirect(self, location, cookies=None):
+        self.send_response(302)
+        self.send_header('Location', location)
+        for cookie in cookies or []:
+            self.send_header('Set-Cookie', cookie)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def read_form(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        fields = parse_qs(self.rfile.read(length).decode('utf-8'))
+        return {key: values[0] for key, values in fields.items()}
+
+    def before_request(self):
+        """Latence simulée et panne injectée ; retourne False si la requête a été rejetée."""
+        with self.mock.lock:
+            self.mock.stats['requests'] += 1
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        path = urlparse(self.path).path
+        if not path.startswith('/ap/') and path != '/robots.txt' and self.mock.should_fail():
+            self.send(503, page('Service Unavailable', '<h1>Service Unavailable</h1>'))
+            return False
+        return True
+
+    def do_GET(self):
+        if not self.before_request():
+            return
+        url = urlparse(self.path)
+        path, query = url.path, parse_qs(url.query)
+
+        if path == '/robots.txt':
+            return self.send(200, 'User-agent: *\nDisallow: /\n', 'text/plain')
+        if path == '/ap/signin':
+            return self.send(200, self.signin_page())
+        if path == '/ap/mfa':
+            return self.send(200, self.mfa_page())
+        if not self.logged_in():
+            return self.redirect('/ap/signin')
+
+        if path in ('/', '/home'):
+            return self.send(200, page('Vendor Central', '<div id="dashboard"><h1>Vendor Central</h1></div>'))
+        if path == '/account-switcher/regional/vendorGroup':
+            return self.send(200, self.switcher_page())
+        if path == '/account-switcher/select':
+            index = query.get('index', [''])[0]
+            return self.redirect('/home', [f"vc-account={index}; Path=/"])
+        if path == '/sellingpartner/developerconsole':
+            return self.send(200, self.console_page())
+        if path.startswith('/api/applications/'):
+            app = self.application(path.split('/')[3])
+            return self.send_json(200, app) if app else self.send_json(404, {'error': 'not found'})
+        return self.send(404, page('Not found', '<h1>Not found</h1>'))
+
+    def do_POST(self):
+        if not self.before_request():
+            return
+        path = urlparse(self.path).path
+
+        if path == '/ap/signin':
+            form = self.read_form()
+            if not form.get('email') or not form.get('password'):
+                return self.redirect('/ap/signin')
+            return self.redirect('/ap/mfa')
+        if path == '/ap/mfa':
+            if not self.mock.verify_otp(self.read_form().get('otpCode', '')):
+                return self.redirect('/ap/mfa')
+            token = secrets.token_hex(16)
+            self.mock.sessions.add(token)
+            return self.redirect('/home', [f"vc-session={token}; Path=/; HttpOnly"])
+        if not self.logged_in():
+            return self.send_json(401, {'error': 'unauthenticated'})
+
+        parts = path.split('/')
+        if len(parts) == 5 and parts[1:3] == ['api', 'applications'] and parts[4] == 'renew':
+            app = self.application(parts[3])
+            return self.send_json(200, self.mock.renew(app)) if app else self.send_json(404, {'error': 'not found'})
+        return self.send_json(404, {'error': 'not found'})
+
+    def application(self, row):
+        account = self.current_account()
+        try:
+            return account['apps'][int(row)] if account else None
+        except (ValueError, IndexError):
+            return None
+
+    def signin_page(self):
+        body = """
+<form id="signIn" method="post" action="/ap/signin">
+  <input type="email" id="ap_email" name="email">
+  <button type="button" id="continue">Continue</button>
+  <div id="passwordSection" class="hidden">
+    <input type="password" id="ap_password" name="password">
+    <input type="submit" id="signInSubmit" value="Sign in">
+  </div>
+</form>"""
+        script = """
+document.getElementById('continue').addEventListener('click', function () {
+    document.getElementById('passwordSection').classList.remove('hidden');
+});"""
+        return page('Amazon Sign-In', body, script)
+
+    def mfa_page(self):
+        body = """
+<form method="post" action="/ap/mfa">
+  <input type="tel" id="auth-mfa-otpcode" name="otpCode">
+  <input type="submit" id="auth-signin-button" value="Sign in">
+</form>"""
+        return page('Two-Step Verification', body)
+
+    def switcher_page(self):
+        names = json.dumps([account['name'] for account in self.mock.accounts])
+        body = """
+<div class="full-page-account-switcher">
+  <div class="full-page-account-switcher-accounts"></div>
+  <button class="kat-button--primary kat-button--base">Select account</button>
+</div>"""
+        script = f"var ACCOUNTS = {names}; var RENDER_DELAY_MS = {int(self.mock.render_delay * 1000)};" + SWITCHER_JS
+        return page('Account switcher', body, script)
+
+    def console_page(self):
+        account = self.current_account()
+        if account is None:
+            return page('Developer Console', '<div>Please select an account first</div>')
+        if account['profile_alert']:
+            return page('Developer Console', f'<div id="app"><div class="alert"><div>{PROFILE_ALERT_TEXT}</div></div></div>')
+
+        rows = []
+        for index, app in enumerate(account['apps']):
+            client_id_cell = f"<kat-table-cell>{app['clientId']}</kat-table-cell>" if self.mock.ids_in_table else ''
+            rows.append(
+                f"<kat-table-row><kat-table-cell>{html.escape(app['name'])}</kat-table-cell>"
+                f"<kat-table-cell>Published</kat-table-cell>"
+                f"<kat-table-cell><div><kat-link data-row='{index}'>View</kat-link></div></kat-table-cell>"
+                f"{client_id_cell}</kat-table-row>"
+            )
+        # Même structure que le XPath absolu utilisé par clientSecret.py
+        body = (
+            "<div id='app'><div class='nav'>Vendor Central</div><div class='main'>"
+            "<div><div><div><div><div><kat-tabs><kat-tab label='Applications'>"
+            "<div>Developer Console</div><div></div><div></div>"
+            "<div><kat-table><kat-table-body><kat-table-row>Header</kat-table-row></kat-table-body></kat-table>"
+            f"<kat-table><kat-table-body id='applicationTableBody'>{''.join(rows)}</kat-table-body></kat-table></div>"
+            "</kat-tab></kat-tabs></div></div></div></div></div>"
+            "</div></div>"
+        )
+        return page('Developer Console', body, CONSOLE_JS)
+
+
+def start_server(mock, host='127.0.0.1', port=0):
+    """Démarre le serveur dans un thread ; retourne (serveur, URL de base)."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.mock = mock
+    threading.Thread(target=server.serve_forever, name='mock-vendorcentral', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux Vendor Central local pour tester clientSecret.py hors ligne.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--accounts', type=int, default=20, help="nombre de comptes vendeurs")
+    parser.add_argument('--apps-per-account', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help="latence ajoutée à chaque requête (secondes)")
+    parser.add_argument('--render-delay', type=float, help="délai de rendu de la liste des comptes (par défaut : latence)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="probabilité de réponse 503 par requête")
+    parser.add_argument('--profile-alert-rate', type=float, default=0.0,
+                        help="proportion de comptes sans profil développeur")
+    parser.add_argument('--ids-in-table', action='store_true', help="affiche les ClientID dans le tableau des applications")
+    parser.add_argument('--otp-secret', default=DEFAULT_OTP_SECRET)
+    parser.add_argument('--accounts-csv', help="écrit la liste des comptes générés dans ce fichier CSV")
+    args = parser.parse_args()
+
+    mock = MockVendorCentral(
+        accounts=args.accounts, apps_per_account=args.apps_per_account, latency=args.latency,
+        render_delay=args.render_delay, failure_rate=args.failure_rate,
+        profile_alert_rate=args.profile_alert_rate, otp_secret=args.otp_secret, ids_in_table=args.ids_in_table,
+    )
+    if args.accounts_csv:
+        mock.write_accounts_csv(args.accounts_csv)
+    server, base_url = start_server(mock, args.host, args.port)
+    print(f"Mock Vendor Central listening on {base_url} (OTP secret {args.otp_secret})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,122 +1,1067 @@
+import argparse
+import csv
 import datetime
+import difflib
+import fnmatch
+import functools
+import hashlib
+import hmac
+import heapq
+import itertools
+import json
 import sys
 import time
+import unicodedata
 import logging
-import pandas as pd
-from openpyxl.styles import PatternFill
-from openpyxl.workbook import Workbook
-from selenium import webdriver
-from selenium.common import NoSuchElementException, TimeoutException, WebDriverException
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+import math
+import queue
+import random
+import re
+import shlex
+import sqlite3
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+from selenium.common import (
+    ElementClickInterceptedException, ElementNotInteractableException, NoSuchElementException,
+    SessionNotCreatedException, StaleElementReferenceException, TimeoutException, WebDriverException,
+)
 import pyotp
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
+# Selenium et webdriver_manager ne sont importés qu'au démarrage du premier navigateur
+# (import_browser_modules), et openpyxl qu'à la lecture ou l'écriture d'un classeur :
+# --help, --dry-run et le plan démarrent sans eux.
+webdriver = ChromeService = ChromeOptions = By = WebDriverWait = EC = ChromeDriverManager = None
+_browser_modules_lock = threading.Lock()
+
+def import_browser_modules():
+    """Importe Selenium et webdriver_manager, une seule fois, avant de démarrer un navigateur."""
+    global webdriver, ChromeService, ChromeOptions, By, WebDriverWait, EC, ChromeDriverManager
+    with _browser_modules_lock:
+        if ChromeDriverManager is not None:
+            return
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from webdriver_manager.chrome import ChromeDriverManager
+
+try:
+    import psutil
+except ImportError:  # La mémoire des navigateurs n'est alors pas mesurée (recyclage au nombre de comptes seulement)
+    psutil = None
+
 # Charger les variables d'environnement
 load_dotenv()
 
 # Constantes
 EXCEL_FILE_PATH = os.getenv('EXCEL_FILE_PATH')
 REPORT_PATH_TEMPLATE = os.path.join(os.getenv('REPORT_PATH'), 'report_{}.xlsx')
+ACCOUNTS_CACHE_PATH = os.getenv('ACCOUNTS_CACHE_PATH') or os.path.join(os.getenv('REPORT_PATH'), 'accounts_cache.json')
+TRACE_PATH_TEMPLATE = os.getenv('TRACE_PATH') or os.path.join(os.getenv('REPORT_PATH'), 'trace_{}.json')
+METRICS_PATH = os.getenv('METRICS_PATH') or os.path.join(os.getenv('REPORT_PATH'), 'secretkey_metrics.prom')
+REPORT_FORMATS = [fmt.strip().lower() for fmt in os.getenv('REPORT_FORMATS', 'xlsx,csv').split(',') if fmt.strip()]
+REPORT_FLUSH_EVERY = int(os.getenv('REPORT_FLUSH_EVERY', '20'))  # Lignes entre deux écritures sur disque (CSV/JSONL)
+VENDOR_CENTRAL_URL = os.getenv('VENDOR_CENTRAL_URL', 'https://vendorcentral.amazon.fr').rstrip('/')
+ACCOUNT_SWITCHER_PATH = "/account-switcher/regional/vendorGroup"
+DEVELOPER_CONSOLE_PATH = "/sellingpartner/developerconsole?ref_=vc_xx_subNav"
+
+# Régions : chaque compte est traité sur le domaine Vendor Central de sa région.
+# La région par défaut utilise VENDOR_CENTRAL_URL ; REGION_BASE_URLS="DE=https://...,GB=https://..." complète ou remplace.
+DEFAULT_REGION = os.getenv('DEFAULT_REGION', 'FR').strip().upper()
+# Sans colonne Region, deviner la région du préfixe du nom ("DE - ...") ou du libellé ("BE_...") : opt-in
+REGION_FROM_NAME = os.getenv('REGION_FROM_NAME', '').strip().lower() in ('1', 'true', 'yes')
+MARKETPLACE_DOMAINS = {
+    'FR': 'amazon.fr', 'DE': 'amazon.de', 'IT': 'amazon.it', 'ES': 'amazon.es', 'GB': 'amazon.co.uk',
+    'NL': 'amazon.nl', 'PL': 'amazon.pl', 'SE': 'amazon.se', 'BE': 'amazon.com.be', 'US': 'amazon.com',
+}
+REGION_BASE_URLS = {region: f"https://vendorcentral.{domain}" for region, domain in MARKETPLACE_DOMAINS.items()}
+REGION_BASE_URLS[DEFAULT_REGION] = VENDOR_CENTRAL_URL
+for _item in (os.getenv('REGION_BASE_URLS') or '').split(','):
+    if '=' in _item:
+        _region, _url = _item.split('=', 1)
+        REGION_BASE_URLS[_region.strip().upper()] = _url.strip().rstrip('/')
 AMAZON_EMAIL = os.getenv('AMAZON_EMAIL')
 AMAZON_PASSWORD = os.getenv('AMAZON_PASSWORD')
 AMAZON_OTP_SECRET = os.getenv('AMAZON_OTP_SECRET')
+# Table des secrets OTP produite par QRCODE.py, utilisée quand AMAZON_OTP_SECRET n'est pas défini
+OTP_SECRETS_PATH = os.getenv('OTP_SECRETS_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'otp_secrets.json')
+OTP_ACCOUNT = os.getenv('OTP_ACCOUNT') or f"Amazon:{AMAZON_EMAIL}"  # Clé issuer:compte dans la table
+
+# Configuration du navigateur
+CHROME_DRIVER_PATH = os.getenv('CHROME_DRIVER_PATH')
+CHROME_DRIVER_VERSION = os.getenv('CHROME_DRIVER_VERSION')  # Version de chromedriver épinglée (optionnel)
+CHROME_OPTIONS = shlex.split(os.getenv('CHROME_OPTIONS') or '')
+DRIVER_CACHE_FILE = os.getenv('DRIVER_CACHE_FILE') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.chromedriver.json')
+BROWSER_PROFILE = os.getenv('BROWSER_PROFILE', 'lean')  # 'lean' (performance) ou 'standard'
+PAGE_LOAD_STRATEGY = os.getenv('PAGE_LOAD_STRATEGY', 'eager')
+
+# Profil 'lean' : ressources bloquées via CDP et options Chrome allégées
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3', '*.ogg', '*.wav',
+]
+LEAN_CHROME_ARGUMENTS = [
+    '--headless=new',
+    '--window-size=1920,1080',
+    '--disable-extensions',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-background-networking',
+    '--no-first-run',
+]
+
+# Journal de reprise (JSONL, un enregistrement fsync'é par compte terminé)
+JOURNAL_PATH = os.getenv('JOURNAL_PATH') or os.path.join(os.getenv('REPORT_PATH'), 'journal.jsonl')
+JOURNAL_INCLUDE_SECRETS = os.getenv('JOURNAL_INCLUDE_SECRETS', '').strip().lower() in ('1', 'true', 'yes')
+
+# Renouvellement et planification des vérifications
+RENEWAL_THRESHOLD_DAYS = int(os.getenv('RENEWAL_THRESHOLD_DAYS', '30'))
+AUDIT_ONLY = os.getenv('AUDIT_ONLY', '').strip().lower() in ('1', 'true', 'yes')  # Lire les expirations sans jamais renouveler
+STATE_DB_PATH = os.getenv('STATE_DB_PATH') or os.path.join(os.getenv('REPORT_PATH'), 'state.sqlite3')
+CHECK_HORIZON_DAYS = int(os.getenv('CHECK_HORIZON_DAYS', '35'))  # Vérifier les clés qui expirent dans ce délai
+STATE_MAX_AGE_DAYS = int(os.getenv('STATE_MAX_AGE_DAYS', '7'))  # Revérifier les comptes non vus depuis ce délai
+
+# Pool de navigateurs
+WORKER_COUNT = int(os.getenv('WORKER_COUNT', min(4, os.cpu_count() or 1)))
+MAX_CONCURRENT_LOGINS = int(os.getenv('MAX_CONCURRENT_LOGINS', '2'))
+STOP_EVENT = threading.Event()  # Demande d'arrêt des workers (Ctrl-C, connexion refusée)
+
+# Recyclage des navigateurs : Chrome est relancé, session conservée, quand sa mémoire ou son nombre de comptes dépasse un seuil
+BROWSER_RECYCLE_ACCOUNTS = int(os.getenv('BROWSER_RECYCLE_ACCOUNTS', '100'))  # Comptes par navigateur (0 : pas de limite)
+BROWSER_RECYCLE_RSS_MB = float(os.getenv('BROWSER_RECYCLE_RSS_MB', '1500'))  # RSS de chromedriver + Chrome, en Mio (0 : pas de limite)
+
+# Reprise des échecs transitoires : file différée traitée en fin de tour, avec backoff exponentiel
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '3'))  # Tentatives par compte, première comprise
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '5'))  # Délai avant un tour de reprise (secondes)
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '120'))
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', '5'))  # Échecs consécutifs d'une étape avant ouverture
+
+# Moteur d'attente : timeouts et intervalles de polling par étape
+# (ex. WAIT_TIMEOUTS="account_list=20,modal_close=5")
+WAIT_DEFAULT_TIMEOUT = float(os.getenv('WAIT_DEFAULT_TIMEOUT', '10'))
+WAIT_DEFAULT_POLL = float(os.getenv('WAIT_DEFAULT_POLL', '0.25'))
+FAST_MODE = os.getenv('FAST_MODE', '1').strip().lower() in ('1', 'true', 'yes')
+
+# Cache de session authentifiée (optionnel) : cookies + localStorage après connexion
+SESSION_CACHE_PATH = os.getenv('SESSION_CACHE_PATH')
+
+# Mode service (--daemon) : navigateurs gardés connectés, vérifications planifiées et API HTTP locale
+DAEMON_HOST = os.getenv('DAEMON_HOST', '127.0.0.1')
+DAEMON_PORT = int(os.getenv('DAEMON_PORT', '8765'))
+DAEMON_TOKEN = os.getenv('DAEMON_TOKEN')  # Jeton exigé pour POST /check et /renew (sans jeton, ces routes sont refusées)
+# Journal des renouvellements du service, clés comprises (fichier 0600) : seule copie des clés renouvelées
+DAEMON_JOURNAL_PATH = os.getenv('DAEMON_JOURNAL_PATH') or os.path.join(os.getenv('REPORT_PATH'), 'daemon_journal.jsonl')
+DAEMON_MIN_RECHECK_MINUTES = float(os.getenv('DAEMON_MIN_RECHECK_MINUTES', '60'))  # Délai minimal entre deux vérifications d'une clé
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 INFO = logging.info
 ERROR = logging.error
-WARNING = logging.WARNING
+WARNING = logging.warning
+
+# Clés secrètes Vendor Central (format amzn1.oa2-cs.v1.<hex>) et valeurs sensibles connues
+SECRET_PATTERN = re.compile(r'amzn1\.oa2-cs\.v1\.[0-9A-Za-z]+')
+_known_secrets = set()
+
+def register_secret(value):
+    """Ajoute une valeur à masquer dans tous les logs."""
+    if value and len(str(value)) >= 8:
+        _known_secrets.add(str(value))
+
+def redact(text):
+    text = SECRET_PATTERN.sub('[REDACTED]', text)
+    for value in list(_known_secrets):
+        if value in text:
+            text = text.replace(value, '[REDACTED]')
+    return text
+
+class SecretRedactingFilter(logging.Filter):
+    """Masque les clés secrètes et identifiants dans chaque message avant son écriture."""
+
+    def filter(self, record):
+        message = record.getMessage()
+        redacted = redact(message)
+        if redacted != message:
+            record.msg, record.args = redacted, ()
+        return True
+
+for _handler in logging.getLogger().handlers:
+    _handler.addFilter(SecretRedactingFilter())
+for _value in (AMAZON_PASSWORD, AMAZON_OTP_SECRET):
+    register_secret(_value)
+
+def parse_step_settings(raw):
+    """Parse une liste "etape=valeur,etape=valeur" en dictionnaire de flottants."""
+    settings = {}
+    for item in (raw or '').split(','):
+        if '=' not in item:
+            continue
+        step, value = item.split('=', 1)
+        try:
+            settings[step.strip()] = float(value)
+        except ValueError:
+            logging.warning(f"Invalid wait setting ignored: {item.strip()}")
+    return settings
+
+WAIT_TIMEOUTS = parse_step_settings(os.getenv('WAIT_TIMEOUTS'))
+WAIT_POLL_INTERVALS = parse_step_settings(os.getenv('WAIT_POLL_INTERVALS'))
+
+# Durée des anciens time.sleep fixes, par étape (référence pour le fast mode)
+LEGACY_SLEEPS = {
+    'account_list': 5,
+    'account_submit': 2,
+    'modal_close': 2,
+}
+
+WAIT_STATS = {}  # étape -> [nombre d'attentes, secondes attendues, secondes des anciens sleeps]
+_wait_stats_lock = threading.Lock()
+
+def wait_for(context, condition, step, timeout=None, poll=None):
+    """Attend qu'une condition DOM soit remplie et enregistre la durée de l'étape.
+
+    ``context`` est le driver ou un WebElement. Le timeout et l'intervalle de
+    polling viennent de WAIT_TIMEOUTS / WAIT_POLL_INTERVALS pour l'étape, sinon
+    des valeurs par défaut. Hors fast mode, l'attente est complétée jusqu'à la
+    durée de l'ancien time.sleep de l'étape pour garder l'ancien rythme.
+    """
+    timeout = timeout if timeout is not None else WAIT_TIMEOUTS.get(step, WAIT_DEFAULT_TIMEOUT)
+    poll = poll if poll is not None else WAIT_POLL_INTERVALS.get(step, WAIT_DEFAULT_POLL)
+    legacy_sleep = LEGACY_SLEEPS.get(step, 0)
+
+    start = time.monotonic()
+    try:
+        return WebDriverWait(context, timeout, poll_frequency=poll).until(condition)
+    finally:
+        waited = time.monotonic() - start
+        if not FAST_MODE and waited < legacy_sleep:
+            time.sleep(legacy_sleep - waited)
+            waited = legacy_sleep
+        with _wait_stats_lock:
+            stats = WAIT_STATS.setdefault(step, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += waited
+            stats[2] += legacy_sleep
+
+def report_wait_savings():
+    """Journalise, par étape, le temps gagné par rapport aux anciens time.sleep."""
+    total_saved = 0.0
+    for step, (count, waited, legacy) in sorted(WAIT_STATS.items()):
+        if not legacy:
+            continue
+        saved = legacy - waited
+        total_saved += saved
+        INFO(f"[fast mode] {step}: {count} wait(s), {waited:.1f}s waited vs {legacy:.1f}s of fixed sleeps, {saved:.1f}s saved")
+    INFO(f"[fast mode] Total time saved against fixed sleeps: {total_saved:.1f}s")
+
+class elements_populated:
+    """Condition : la liste ciblée contient au moins un élément et sa taille est stable entre deux pollings."""
+
+    def __init__(self, locator, min_count=1):
+        self.locator = locator
+        self.min_count = min_count
+        self.last_count = None
+
+    def __call__(self, context):
+        elements = context.find_elements(*self.locator)
+        count = len(elements)
+        stable = count >= self.min_count and count == self.last_count
+        self.last_count = count
+        return elements if stable else False
+
+def modal_detached(locator):
+    """Condition : plus aucun modal correspondant n'est affiché (retiré du DOM ou masqué)."""
+    def _predicate(context):
+        try:
+            return not any(modal.is_displayed() for modal in context.find_elements(*locator))
+        except StaleElementReferenceException:
+            return True
+    return _predicate
+
+def page_loaded_or_present(locator):
+    """Condition : l'élément ciblé est présent, ou la page a fini de charger sans lui."""
+    def _predicate(driver):
+        if driver.find_elements(*locator):
+            return True
+        return driver.execute_script("return document.readyState") == 'complete'
+    return _predicate
+
+# Traçage : une span chronométrée par étape, avec son résultat et le nombre d'allers-retours WebDriver
+TRACED_STEPS = ('login', 'account_selection', 'app_lookup', 'modal_open', 'extraction', 'renewal')
+SPANS = []
+_spans_lock = threading.Lock()
+_trace_context = threading.local()
+
+@contextmanager
+def span(step, **attributes):
+    """Chronomètre une étape pour le compte en cours du thread ; le résultat peut être modifié via la span."""
+    current = {
+        'step': step,
+        'account': getattr(_trace_context, 'account', None),
+        'worker': threading.current_thread().name,
+        'start': time.time(),
+        'outcome': 'ok',
+        'round_trips': 0,
+        **attributes,
+    }
+    stack = _trace_context.__dict__.setdefault('stack', [])
+    stack.append(current)
+    start = time.monotonic()
+    try:
+        yield current
+    except BaseException as e:
+        current['outcome'] = 'transient' if isinstance(e, TransientError) else 'error'
+        current['error'] = type(e).__name__
+        raise
+    finally:
+        current['duration'] = round(time.monotonic() - start, 4)
+        stack.remove(current)
+        with _spans_lock:
+            SPANS.append(current)
+
+def traced(step, failed=lambda result: result is False):
+    """Décorateur : exécute la fonction dans une span ; ``failed(résultat)`` marque l'étape en échec."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(step) as current:
+                result = function(*args, **kwargs)
+                if failed(result):
+                    current['outcome'] = 'failed'
+                return result
+        return wrapper
+    return decorator
+
+def count_round_trips(driver):
+    """Compte chaque commande WebDriver dans les spans actives du thread."""
+    execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        for active in getattr(_trace_context, 'stack', ()):
+            active['round_trips'] += 1
+        return execute(driver_command, params)
+
+    driver.execute = counted_execute
+    return driver
+
+def percentile(values, fraction):
+    """Percentile par rang le plus proche (valeurs non vides)."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))]
+
+def summarize_spans():
+    """Statistiques par étape : nombre, p50/p95/total des durées, échecs et allers-retours WebDriver."""
+    with _spans_lock:
+        spans = list(SPANS)
+    summary = {}
+    steps = {item['step'] for item in spans}
+    for step in [name for name in TRACED_STEPS if name in steps] + sorted(steps - set(TRACED_STEPS)):
+        items = [item for item in spans if item['step'] == step]
+        durations = [item['duration'] for item in items]
+        summary[step] = {
+            'count': len(items),
+            'p50': percentile(durations, 0.50),
+            'p95': percentile(durations, 0.95),
+            'total': round(sum(durations), 3),
+            'failures': sum(item['outcome'] in ('failed', 'error', 'transient') for item in items),
+            'round_trips': sum(item['round_trips'] for item in items),
+            'outcomes': {outcome: sum(item['outcome'] == outcome for item in items) for outcome in {item['outcome'] for item in items}},
+        }
+    return summary
+
+def write_trace(path):
+    """Exporte toutes les spans et leur résumé dans un fichier JSON."""
+    with _spans_lock:
+        spans = list(SPANS)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'spans': spans, 'summary': summarize_spans(), 'memory': {
+            'summary': summarize_memory(), 'samples': MEMORY_SAMPLES, 'recycles': RECYCLE_EVENTS,
+        }}, f, ensure_ascii=False, indent=1, default=str)
+    INFO(f"Trace written to {path}")
+
+def write_prometheus_metrics(path):
+    """Exporte le résumé au format textfile Prometheus (écriture atomique pour le collecteur textfile)."""
+    lines = [
+        '# HELP secretkey_step_duration_seconds Duration of each renewal pipeline step.',
+        '# TYPE secretkey_step_duration_seconds summary',
+    ]
+    summary = summarize_spans()
+    for step, stats in summary.items():
+        lines.append(f'secretkey_step_duration_seconds{{step="{step}",quantile="0.5"}} {stats["p50"]}')
+        lines.append(f'secretkey_step_duration_seconds{{step="{step}",quantile="0.95"}} {stats["p95"]}')
+        lines.append(f'secretkey_step_duration_seconds_sum{{step="{step}"}} {stats["total"]}')
+        lines.append(f'secretkey_step_duration_seconds_count{{step="{step}"}} {stats["count"]}')
+    lines += ['# HELP secretkey_step_outcomes_total Step executions by outcome.', '# TYPE secretkey_step_outcomes_total counter']
+    for step, stats in summary.items():
+        for outcome, count in sorted(stats['outcomes'].items()):
+            lines.append(f'secretkey_step_outcomes_total{{step="{step}",outcome="{outcome}"}} {count}')
+    lines += ['# HELP secretkey_step_webdriver_round_trips_total WebDriver commands issued per step.',
+              '# TYPE secretkey_step_webdriver_round_trips_total counter']
+    for step, stats in summary.items():
+        lines.append(f'secretkey_step_webdriver_round_trips_total{{step="{step}"}} {stats["round_trips"]}')
+    memory = summarize_memory()
+    lines += ['# HELP secretkey_browser_recycles_total Browser restarts triggered by the memory or account thresholds.',
+              '# TYPE secretkey_browser_recycles_total counter',
+              f'secretkey_browser_recycles_total {memory["recycles"]}']
+    if memory['peak_rss_mb'] is not None:
+        lines += ['# HELP secretkey_browser_peak_rss_bytes Peak RSS of one browser (chromedriver + Chrome) during the run.',
+                  '# TYPE secretkey_browser_peak_rss_bytes gauge',
+                  f'secretkey_browser_peak_rss_bytes {memory["peak_rss_mb"] * MIB:.0f}']
+    lines.append(f'secretkey_last_run_timestamp_seconds {time.time():.0f}')
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
+    INFO(f"Prometheus metrics written to {path}")
+
+def summary_rows():
+    """Lignes de la feuille de synthèse du rapport (une par étape)."""
+    return [
+        [step, stats['count'], stats['p50'], stats['p95'], stats['total'], stats['failures'], stats['round_trips']]
+        for step, stats in summarize_spans().items()
+    ]
+
+SUMMARY_HEADERS = ["Step", "Count", "p50 (s)", "p95 (s)", "Total (s)", "Failures", "WebDriver round-trips"]
 
-def read_accounts_from_excel(file_path):
-    """Lire les comptes et IDs depuis le fichier Excel."""
+# Mémoire des navigateurs : un échantillon par compte traité, et les recyclages effectués
+MEMORY_SAMPLES = []
+RECYCLE_EVENTS = []
+_memory_lock = threading.Lock()
+MIB = 1024 * 1024
+
+def browser_rss(driver):
+    """RSS cumulée de chromedriver et de ses processus Chrome, en octets ; None sans psutil."""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    rss = 0
+    for item in processes:
+        try:
+            rss += item.memory_info().rss
+        except psutil.Error:
+            continue  # Processus de rendu terminé entre-temps
+    return rss
+
+def sample_browser(driver, account_name, seconds):
+    """Échantillonne le navigateur après un compte : RSS et durée du compte. Retourne la RSS en octets (ou None)."""
+    driver.accounts_processed = getattr(driver, 'accounts_processed', 0) + 1
+    rss = browser_rss(driver)
+    with _memory_lock:
+        MEMORY_SAMPLES.append({
+            'time': round(time.time(), 3),
+            'worker': threading.current_thread().name,
+            'region': getattr(driver, 'region', None),
+            'account': account_name,
+            'browser_accounts': driver.accounts_processed,
+            'rss_mb': None if rss is None else round(rss / MIB, 1),
+            'seconds': round(seconds, 3),
+        })
+    return rss
+
+def recycle_reason(driver, rss):
+    """Motif de recyclage du navigateur, ou None s'il peut continuer."""
+    accounts = getattr(driver, 'accounts_processed', 0)
+    if BROWSER_RECYCLE_ACCOUNTS and accounts >= BROWSER_RECYCLE_ACCOUNTS:
+        return f"{accounts} accounts processed"
+    if BROWSER_RECYCLE_RSS_MB and rss is not None and rss / MIB >= BROWSER_RECYCLE_RSS_MB:
+        return f"RSS {rss / MIB:.0f} MiB"
+    return None
+
+def summarize_memory():
+    """Synthèse mémoire de l'exécution : pic de RSS, recyclages et durée des premiers/derniers comptes de chaque navigateur."""
+    with _memory_lock:
+        samples, events = list(MEMORY_SAMPLES), list(RECYCLE_EVENTS)
+    rss_values = [sample['rss_mb'] for sample in samples if sample['rss_mb'] is not None]
+    durations = [sample['seconds'] for sample in sorted(samples, key=lambda sample: sample['browser_accounts'])]
+    tenth = max(1, len(durations) // 10)
+    return {
+        'samples': len(samples),
+        'peak_rss_mb': max(rss_values) if rss_values else None,
+        'recycles': len(events),
+        'relogins': sum(event['relogin'] for event in events),
+        # Un navigateur qui se dégrade rend ses derniers comptes plus lents que les premiers
+        'first_accounts_mean_s': round(statistics.mean(durations[:tenth]), 3) if durations else None,
+        'last_accounts_mean_s': round(statistics.mean(durations[-tenth:]), 3) if durations else None,
+    }
+
+MEMORY_HEADERS = ["Time", "Worker", "Region", "Account", "Accounts in browser", "Browser RSS (MiB)", "Account (s)", "Recycle"]
+
+def memory_rows():
+    """Lignes de la feuille mémoire du rapport : la courbe de RSS, avec les recyclages à leur place."""
+    with _memory_lock:
+        samples, events = list(MEMORY_SAMPLES), list(RECYCLE_EVENTS)
+    rows = [(sample['time'], [sample['worker'], sample['region'], sample['account'], sample['browser_accounts'],
+                              sample['rss_mb'], sample['seconds'], None]) for sample in samples]
+    rows += [(event['time'], [event['worker'], event['region'], None, event['accounts'], event['rss_after_mb'],
+                              event['seconds'], f"{event['reason']}{' (re-login)' if event['relogin'] else ''}"])
+             for event in events]
+    rows.sort(key=lambda item: item[0])
+    return [[datetime.fromtimestamp(timestamp).isoformat(timespec='seconds')] + row for timestamp, row in rows]
+
+# Échecs transitoires : réessayés en fin de tour ; les autres échecs sont définitifs pour l'exécution
+TRANSIENT_EXCEPTIONS = (
+    TimeoutException, StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException,
+)
+
+class TransientError(Exception):
+    """Échec transitoire d'une étape (timeout, élément périmé, modal détaché) : le compte sera réessayé."""
+
+    def __init__(self, step, cause):
+        detail = cause.msg if isinstance(cause, WebDriverException) else str(cause)
+        detail = detail.strip().splitlines()[0] if detail and detail.strip() else ''
+        super().__init__(f"{type(cause).__name__} during {step}" + (f" ({detail})" if detail else ''))
+        self.step = step
+
+class SessionLostError(TransientError):
+    """La session Vendor Central a expiré : redirection vers la page de connexion."""
+
+class LoginError(Exception):
+    """Connexion refusée (identifiants, secret OTP absent) : définitif, ni réessayé ni reporté."""
+
+def session_lost(driver):
+    try:
+        return '/ap/' in driver.current_url
+    except WebDriverException:
+        return False
+
+def raise_if_transient(driver, step, error):
+    """Propage un échec transitoire au lieu de seulement le journaliser ; sans effet pour un échec définitif."""
+    if isinstance(error, TransientError):
+        raise error
+    if isinstance(error, TRANSIENT_EXCEPTIONS):
+        if session_lost(driver):
+            raise SessionLostError(step, error) from error
+        raise TransientError(step, error) from error
+
+class CircuitBreaker:
+    """Disjoncteur par étape : ouvert après ``threshold`` échecs transitoires consécutifs de la même étape.
+
+    Tant qu'une étape est ouverte, les workers ne prennent plus de nouveau
+    compte ; le tour suivant ne réessaie qu'un compte (semi-ouvert). Un compte
+    traité avec succès referme tous les disjoncteurs.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = max(1, CIRCUIT_BREAKER_THRESHOLD if threshold is None else threshold)
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def record_failure(self, step):
+        with self._lock:
+            self.failures[step] = self.failures.get(step, 0) + 1
+            opened = self.failures[step] == self.threshold
+        if opened:
+            WARNING(f"Circuit breaker open for step {step} after {self.threshold} consecutive transient failures")
+
+    def record_success(self):
+        with self._lock:
+            self.failures.clear()
+
+    def open_steps(self):
+        with self._lock:
+            return {step for step, count in self.failures.items() if count >= self.threshold}
+
+    def half_open(self):
+        """Autorise un essai : un nouvel échec rouvre le disjoncteur, un succès le referme."""
+        with self._lock:
+            for step, count in self.failures.items():
+                if count >= self.threshold:
+                    self.failures[step] = self.threshold - 1
+
+def retry_delay(level):
+    """Backoff exponentiel plafonné, avec une gigue de ±25 % pour désynchroniser les workers."""
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** level) * random.uniform(0.75, 1.25)
+
+def failure_row(account, attempts, step, error):
+    """Ligne du rapport d'un compte abandonné pour cette exécution (non journalisé : --resume le refera)."""
+    return [account['AccountName'], account['ClientID'], "N/A", "N/A", "N/A", "N/A", "N/A", "N/A",
+            f"Failed after {attempts} attempt(s) at step {step}: {error}", account_region(account)]
+
+CLIENT_ID_PATTERN = re.compile(r'^amzn1\.application-oa2-client\.[0-9a-f]{32}$')
+ACCOUNTS_CACHE_VERSION = 3  # À incrémenter quand la forme des comptes en cache change
+REGION_HEADERS = ('region', 'région', 'marketplace')
+
+def derive_region(account_name, label=None, region=None):
+    """Région du compte : colonne Region, sinon ``DEFAULT_REGION``.
+
+    Avec ``REGION_FROM_NAME``, une ligne sans région prend celle du préfixe du
+    nom ("FR - ...") ou du libellé ("BE_...").
+    """
+    region = str(region or '').strip().upper()
+    if region:
+        return region
+    if not REGION_FROM_NAME:
+        return DEFAULT_REGION
+    match = re.match(r'^([A-Za-z]{2})\s+-\s', account_name) or re.match(r'^([A-Za-z]{2})_', str(label or ''))
+    return match.group(1).upper() if match else DEFAULT_REGION
+
+def region_base_url(region):
+    if region not in REGION_BASE_URLS:
+        logging.warning(f"No Vendor Central URL for region {region}, using {VENDOR_CENTRAL_URL}")
+        REGION_BASE_URLS[region] = VENDOR_CENTRAL_URL
+    return REGION_BASE_URLS[region]
+
+def account_region(account):
+    return account.get('Region') or DEFAULT_REGION
+
+def bind_region(driver, region):
+    """Rattache le navigateur à une région : toutes ses URL Vendor Central en dépendent."""
+    driver.region = region
+    driver.vendor_central_url = region_base_url(region)
+    return driver
+
+def vendor_url(driver, path=''):
+    """URL Vendor Central de la région du navigateur."""
+    return f"{getattr(driver, 'vendor_central_url', VENDOR_CENTRAL_URL)}{path}"
+
+def session_cache_path(driver):
+    """Fichier de cache de session de la région du navigateur (suffixé hors région par défaut)."""
+    region = getattr(driver, 'region', DEFAULT_REGION)
+    if not SESSION_CACHE_PATH or region == DEFAULT_REGION:
+        return SESSION_CACHE_PATH
+    root, extension = os.path.splitext(SESSION_CACHE_PATH)
+    return f"{root}.{region.lower()}{extension}"
+
+def region_column(header):
+    """Index de la colonne Region d'une ligne d'en-tête, ou None."""
+    for position, title in enumerate(header):
+        if str(title or '').strip().casefold() in REGION_HEADERS:
+            return position
+    return None
+
+def iter_account_rows(file_path):
+    """Itère les tuples (nom du compte, libellé, ClientID, région) des colonnes A, B et C et d'une colonne Region facultative.
+
+    Un CSV peut aussi nommer ses colonnes AccountName / ClientID / Region.
+    """
+    def cell(row, position):
+        return row[position] if position is not None and position < len(row) else None
+
+    if file_path.lower().endswith('.csv'):
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            name_column, label_column, id_column = 0, 1, 2
+            if 'AccountName' in header and 'ClientID' in header:
+                name_column, label_column, id_column = header.index('AccountName'), None, header.index('ClientID')
+            region_position = region_column(header)
+            for row in reader:
+                yield cell(row, name_column), cell(row, label_column), cell(row, id_column), cell(row, region_position)
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
     try:
-        df = pd.read_excel(file_path, usecols='A,C', names=['AccountName', 'ClientID'])
-        accounts = df.to_dict('records')  # Convertir en liste de dictionnaires
+        rows = workbook.active.iter_rows(values_only=True)
+        region_position = region_column(next(rows, ()))
+        for row in rows:
+            yield cell(row, 0), cell(row, 1), cell(row, 2), cell(row, region_position)
+    finally:
+        workbook.close()
+
+def parse_accounts(file_path):
+    """Lit, valide et dédoublonne les comptes ; les noms sont normalisés (espaces compactés)."""
+    accounts, seen = [], set()
+    for line_number, (account_name, label, client_id, region) in enumerate(iter_account_rows(file_path), 2):
+        account_name = ' '.join(str(account_name or '').split())
+        client_id = str(client_id or '').strip()
+        if not account_name and not client_id:
+            continue
+        if not CLIENT_ID_PATTERN.match(client_id):
+            logging.warning(f"Line {line_number}: invalid ClientID {client_id!r} for account {account_name!r}, ignored.")
+            continue
+        if client_id in seen:
+            logging.warning(f"Line {line_number}: duplicate ClientID {client_id} for account {account_name!r}, ignored.")
+            continue
+        seen.add(client_id)
+        accounts.append({'AccountName': account_name, 'ClientID': client_id, 'Region': derive_region(account_name, label, region)})
+    return accounts
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_accounts_from_excel(file_path, cache_path=None):
+    """Lire les comptes et IDs depuis le fichier Excel (ou CSV), avec un cache indexé sur mtime/taille/hash."""
+    cache_path = ACCOUNTS_CACHE_PATH if cache_path is None else cache_path
+    stat = os.stat(file_path)
+    cache = {}
+    if cache_path:
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+    same_file = (cache.get('path') == os.path.abspath(file_path) and cache.get('version') == ACCOUNTS_CACHE_VERSION
+                 and cache.get('region_from_name') == REGION_FROM_NAME)
+    if same_file and cache.get('mtime_ns') == stat.st_mtime_ns and cache.get('size') == stat.st_size:
+        logging.info(f"Loaded {len(cache['accounts'])} accounts from cache.")
+        return cache['accounts']
+
+    # mtime modifiée (copie, checkout...) : le hash décide si le contenu a changé
+    sha256 = file_sha256(file_path)
+    if same_file and cache.get('sha256') == sha256:
+        accounts = cache['accounts']
+        logging.info(f"Loaded {len(accounts)} accounts from cache (content unchanged).")
+    else:
+        accounts = parse_accounts(file_path)
         logging.info(f"Loaded {len(accounts)} accounts from Excel.")
-        return accounts
-    except Exception as e:
-        logging.error(f"Error reading Excel file: {e}")
-        return []
 
-def setup_driver():
-    """Initialise le WebDriver Chrome."""
+    if cache_path:
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': ACCOUNTS_CACHE_VERSION, 'region_from_name': REGION_FROM_NAME, 'path': os.path.abspath(file_path),
+                           'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                           'sha256': sha256, 'accounts': accounts}, f, ensure_ascii=False)
+        except OSError as e:
+            logging.warning(f"Could not write accounts cache {cache_path}: {e}")
+    return accounts
+
+_driver_path_lock = threading.Lock()
+
+def resolve_driver_path(refresh=False):
+    """Retourne le chemin de chromedriver, sans requête réseau dès qu'il est connu.
+
+    Ordre : CHROME_DRIVER_PATH, puis le chemin mis en cache dans DRIVER_CACHE_FILE
+    pour la version épinglée CHROME_DRIVER_VERSION, puis ChromeDriverManager.
+    Seule une version épinglée est mise en cache : sans elle, Driver Manager
+    choisit à chaque lancement le driver du Chrome installé, qui peut avoir été
+    mis à jour. ``refresh`` ignore et supprime le cache.
+    """
+    if CHROME_DRIVER_PATH:
+        return CHROME_DRIVER_PATH
+
+    with _driver_path_lock:
+        if refresh:
+            try:
+                os.remove(DRIVER_CACHE_FILE)
+            except OSError:
+                pass
+        elif CHROME_DRIVER_VERSION:
+            try:
+                with open(DRIVER_CACHE_FILE, encoding='utf-8') as f:
+                    cached = json.load(f)
+                if os.path.exists(cached['path']) and cached.get('version') == CHROME_DRIVER_VERSION:
+                    return cached['path']
+            except (OSError, ValueError, KeyError):
+                pass
+
+        logging.info("Resolving chromedriver with Driver Manager...")
+        path = ChromeDriverManager(driver_version=CHROME_DRIVER_VERSION).install()
+        if CHROME_DRIVER_VERSION:
+            try:
+                with open(DRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+                    json.dump({'version': CHROME_DRIVER_VERSION, 'path': path}, f)
+            except OSError as e:
+                logging.warning(f"Could not cache chromedriver path: {e}")
+        return path
+
+def build_chrome_options(profile):
+    """Construit les options Chrome du profil 'standard' ou 'lean'."""
     chrome_options = ChromeOptions()
+    if profile == 'lean':
+        for argument in LEAN_CHROME_ARGUMENTS:
+            chrome_options.add_argument(argument)
+        chrome_options.page_load_strategy = PAGE_LOAD_STRATEGY
+    for argument in CHROME_OPTIONS:
+        chrome_options.add_argument(argument)
+    return chrome_options
+
+def setup_driver(profile=None):
+    """Initialise le WebDriver Chrome."""
+    import_browser_modules()
+    profile = profile or BROWSER_PROFILE
+    chrome_options = build_chrome_options(profile)
     try:
-        logging.info("Initializing WebDriver with Driver Manager...")
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
+        logging.info(f"Initializing WebDriver ({profile} profile)...")
+        try:
+            chrome = webdriver.Chrome(service=ChromeService(resolve_driver_path()), options=chrome_options)
+        except SessionNotCreatedException as e:
+            if CHROME_DRIVER_PATH:
+                raise
+            # chromedriver incompatible avec le Chrome installé (mise à jour automatique) : résoudre à nouveau, une fois
+            logging.warning(f"chromedriver rejected by Chrome, resolving it again: {e}")
+            chrome = webdriver.Chrome(service=ChromeService(resolve_driver_path(refresh=True)), options=chrome_options)
+        driver = count_round_trips(chrome)
+        if profile == 'lean':
+            # Bloquer images, polices et médias au niveau réseau
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
         return driver
     except WebDriverException as e:
         logging.error(f"WebDriver error during initialization: {e}")
         sys.exit(1)
 
+@functools.lru_cache(maxsize=None)
+def login_totp():
+    """Générateur TOTP de connexion : AMAZON_OTP_SECRET, sinon l'entrée OTP_ACCOUNT de la table des secrets."""
+    if AMAZON_OTP_SECRET:
+        return pyotp.TOTP(AMAZON_OTP_SECRET)
+    try:
+        with open(OTP_SECRETS_PATH, encoding='utf-8') as f:
+            entry = json.load(f).get('secrets', {}).get(OTP_ACCOUNT)
+    except (OSError, ValueError) as e:
+        raise LoginError(f"No AMAZON_OTP_SECRET and OTP secret map {OTP_SECRETS_PATH} unreadable: {e}") from e
+    if not entry:
+        raise LoginError(f"No AMAZON_OTP_SECRET and no '{OTP_ACCOUNT}' entry in {OTP_SECRETS_PATH} (run QRCODE.py)")
+    totp = pyotp.parse_uri(entry['uri'])
+    register_secret(totp.secret)
+    return totp
+
+AUTH_ERROR_SELECTOR = '#auth-error-message-box'
+
+def wait_for_login_field(driver, field_id, step):
+    """Attend le champ suivant du formulaire ; si Amazon affiche une erreur à la place, la connexion est refusée."""
+    try:
+        return wait_for(driver, EC.presence_of_element_located((By.ID, field_id)), step)
+    except TimeoutException:
+        alerts = driver.find_elements(By.CSS_SELECTOR, AUTH_ERROR_SELECTOR)
+        if alerts:
+            raise LoginError(f"Sign-in refused at {step}: {alerts[0].text.strip() or 'no message'}")
+        raise
+
 def login_to_amazon(driver):
-    """Connectez-vous à Amazon Vendor Central."""
+    """Connectez-vous à Amazon Vendor Central.
+
+    Un refus (identifiants, secret OTP absent) lève ``LoginError`` ; tout
+    autre échec est transitoire.
+    """
+    totp = login_totp()
     try:
         logging.info("Logging into Amazon...")
         driver.delete_all_cookies()
-        driver.get('https://vendorcentral.amazon.fr/')
+        driver.get(vendor_url(driver, '/'))
         driver.maximize_window()
 
         # Saisir le nom d'utilisateur
-        username = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, 'ap_email')))
+        username = wait_for(driver, EC.presence_of_element_located((By.ID, 'ap_email')), 'login_email')
         username.clear()
         username.send_keys(AMAZON_EMAIL)
         driver.find_element(By.ID, 'continue').click()
 
         # Saisir le mot de passe
-        password = driver.find_element(By.ID, 'ap_password')
+        password = wait_for_login_field(driver, 'ap_password', 'login_password')
         password.send_keys(AMAZON_PASSWORD)
         driver.find_element(By.ID, 'signInSubmit').click()
 
         # Saisir le code OTP
-        otp_code = pyotp.TOTP(AMAZON_OTP_SECRET).now()
-        code = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, 'auth-mfa-otpcode')))
-        code.send_keys(otp_code)
+        code = wait_for_login_field(driver, 'auth-mfa-otpcode', 'login_otp')
+        code.send_keys(totp.now())
         driver.find_element(By.ID, 'auth-signin-button').click()
 
         logging.info("Logged into Amazon successfully.")
+    except LoginError:
+        raise
     except Exception as e:
         logging.error(f"Unexpected error during login: {e}")
-        driver.quit()
-        sys.exit(1)
+        # L'appelant décide : reconnexion plus tard ou arrêt du worker, sans tuer le processus
+        raise TransientError('login', e) from e
 
+def session_is_valid(driver):
+    """Sonde peu coûteuse : la page du sélecteur de comptes s'affiche sans redirection vers la connexion."""
+    switcher_locator = (By.CSS_SELECTOR, '.full-page-account-switcher-accounts')
+    try:
+        driver.get(vendor_url(driver, ACCOUNT_SWITCHER_PATH))
+        wait_for(driver, page_loaded_or_present(switcher_locator), 'session_probe')
+        return '/ap/' not in driver.current_url and bool(driver.find_elements(*switcher_locator))
+    except (TimeoutException, WebDriverException) as e:
+        logging.warning(f"Session probe failed: {e}")
+        return False
+
+def capture_session(driver):
+    """Cookies et localStorage du navigateur."""
+    return {
+        'cookies': driver.get_cookies(),
+        'local_storage': driver.execute_script("return Object.assign({}, window.localStorage);"),
+    }
+
+def apply_session(driver, session):
+    """Pose les cookies et le localStorage d'une session capturée dans le navigateur."""
+    # Les cookies ne peuvent être posés que depuis une page du même domaine
+    driver.get(vendor_url(driver, '/robots.txt'))
+    for cookie in session.get('cookies', []):
+        cookie.pop('sameSite', None)
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException as e:
+            logging.debug(f"Cookie {cookie.get('name')} not restored: {e}")
+    driver.execute_script(
+        "for (const [key, value] of Object.entries(arguments[0])) { window.localStorage.setItem(key, value); }",
+        session.get('local_storage', {})
+    )
+
+def save_session(driver, path, login_seconds):
+    """Enregistre les cookies et le localStorage dans un fichier lisible par le seul propriétaire (0600)."""
+    session = {
+        'saved_at': datetime.now().isoformat(timespec='seconds'),
+        'login_seconds': round(login_seconds, 1),
+        **capture_session(driver),
+    }
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(session, f)
+    os.replace(tmp_path, path)  # Écriture atomique, les workers peuvent sauvegarder en parallèle
+    INFO(f"Session saved to {path}")
+
+def restore_session(driver, path):
+    """Recharge une session sauvegardée dans le navigateur ; retourne ses métadonnées ou None."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            session = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Unreadable session cache {path}: {e}")
+        return None
+    apply_session(driver, session)
+    return session
+
+def ensure_logged_in(driver):
+    """Réutilise la session en cache si elle est encore valide, sinon effectue la connexion complète."""
+    cache_path = session_cache_path(driver)
+    with span('login') as current:
+        if cache_path:
+            start = time.monotonic()
+            session = restore_session(driver, cache_path)
+            if session and session_is_valid(driver):
+                elapsed = time.monotonic() - start
+                saved = session.get('login_seconds', 0) - elapsed
+                INFO(f"Session cache hit ({cache_path}, saved {session.get('saved_at')}): "
+                     f"restored in {elapsed:.1f}s, ~{max(saved, 0):.1f}s saved versus a full login")
+                current['outcome'] = 'cache_hit'
+                return
+            INFO(f"Session cache miss ({'expired session' if session else 'no cached session'}), performing full login")
+
+        start = time.monotonic()
+        login_to_amazon(driver)
+        if cache_path:
+            try:
+                # Attendre la fin de la redirection post-MFA avant de capturer les cookies
+                wait_for(driver, lambda d: '/ap/' not in d.current_url, 'login_complete')
+                save_session(driver, cache_path, time.monotonic() - start)
+            except (OSError, TimeoutException, WebDriverException) as e:
+                logging.warning(f"Session not cached: {e}")
+
+SWITCHER_ACCOUNT_SELECTOR = '.full-page-account-switcher-accounts .full-page-account-switcher-account'
+
+# Un seul aller-retour WebDriver pour lire tous les libellés du sélecteur de comptes
+SWITCHER_LABELS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map(function (entry) {
+    var label = entry.querySelector('.full-page-account-switcher-account-label');
+    return label ? label.innerText : '';
+});
+"""
+
+# Clique l'entrée d'index donné et retourne son libellé (vérification côté Python)
+SWITCHER_CLICK_SCRIPT = """
+var entry = document.querySelectorAll(arguments[0])[arguments[1]];
+if (!entry) { return null; }
+var label = entry.querySelector('.full-page-account-switcher-account-label');
+var details = entry.querySelector('.full-page-account-switcher-account-details');
+if (!details) { return null; }
+details.click();
+return label ? label.innerText : '';
+"""
+
+# Index du sélecteur de comptes, construit une fois par exécution et par domaine, partagé par les workers
+_switcher_index = {}  # URL de base -> {nom normalisé -> index de l'entrée}
+_switcher_labels = {}  # URL de base -> {nom normalisé -> libellé d'origine}
+_switcher_lock = threading.Lock()
+
+def normalize_account_name(name):
+    """Normalise un nom de compte : espaces compactés et casse repliée."""
+    return ' '.join(str(name).split()).casefold()
+
+def build_switcher_index(driver, refresh=False):
+    """Construit (ou réutilise) l'index nom normalisé -> position dans le sélecteur de comptes."""
+    base_url = vendor_url(driver)
+    with _switcher_lock:
+        if _switcher_index.get(base_url) and not refresh:
+            return dict(_switcher_index[base_url])
+
+    labels = driver.execute_script(SWITCHER_LABELS_SCRIPT, SWITCHER_ACCOUNT_SELECTOR)
+    index, originals = {}, {}
+    for position, label in enumerate(labels):
+        key = normalize_account_name(label)
+        if key and key not in index:
+            index[key] = position
+            originals[key] = ' '.join(label.split())
+
+    with _switcher_lock:
+        _switcher_index[base_url] = index
+        _switcher_labels[base_url] = originals
+    INFO(f"Indexed {len(index)} accounts from the account switcher of {base_url}.")
+    return index
+
+def suggest_account_names(account_name, limit=3, base_url=None):
+    """Retourne les libellés du sélecteur les plus proches d'un nom introuvable."""
+    with _switcher_lock:
+        labels = dict(_switcher_labels.get(base_url or VENDOR_CENTRAL_URL, {}))
+    matches = difflib.get_close_matches(normalize_account_name(account_name), labels.keys(), n=limit, cutoff=0.6)
+    return [labels[match] for match in matches]
+
+@traced('account_selection')
 def select_client_account(driver, account_name):
+    """Sélectionne le compte dans le sélecteur via l'index en cache ; retourne True si le compte a été soumis."""
     try:
         logging.info(f"Selecting account: {account_name}")
-        driver.get('https://vendorcentral.amazon.fr/account-switcher/regional/vendorGroup')
-        account_list = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '.full-page-account-switcher-accounts'))
-        )
-        time.sleep(3)
-        accounts = account_list.find_elements(By.CLASS_NAME, 'full-page-account-switcher-account')
-        time.sleep(2)
+        driver.get(vendor_url(driver, ACCOUNT_SWITCHER_PATH))
+        # Attendre que la liste des comptes soit remplie (et stable) au lieu de dormir 5s
+        accounts = wait_for(driver, elements_populated((By.CSS_SELECTOR, SWITCHER_ACCOUNT_SELECTOR)), 'account_list')
         logging.info(f"Found {len(accounts)} accounts in the list.")
 
-        account_found = False
+        target = normalize_account_name(account_name)
+        index = build_switcher_index(driver)
+        if target not in index:
+            # Le compte a peut-être été ajouté depuis la construction de l'index
+            index = build_switcher_index(driver, refresh=True)
 
-        for account in accounts:
-            account_label = account.find_element(By.CLASS_NAME, 'full-page-account-switcher-account-label')
-            if account_label.text.strip() == account_name.strip():
-                account.find_element(By.CLASS_NAME, 'full-page-account-switcher-account-details').click()
+        for attempt in range(2):
+            position = index.get(target)
+            if position is None:
+                break
+            clicked_label = driver.execute_script(SWITCHER_CLICK_SCRIPT, SWITCHER_ACCOUNT_SELECTOR, position)
+            if clicked_label is not None and normalize_account_name(clicked_label) == target:
                 logging.info(f"Account {account_name} selected.")
-                account_found = True
-                time.sleep(2)
                 break
+            # La liste a changé depuis la construction de l'index : on le reconstruit une fois
+            logging.warning(f"Account switcher entry {position} is no longer {account_name}, refreshing index.")
+            index = build_switcher_index(driver, refresh=True)
+        else:
+            position = None
 
-        if not account_found:
-            WARNING(f"Account {account_name} not found in the list. Moving to the next client.")
-            return
+        if position is None:
+            suggestions = suggest_account_names(account_name, base_url=vendor_url(driver))
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            WARNING(f"Account {account_name} not found in the list. Moving to the next client.{hint}")
+            return False
 
         try:
-            submit_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, '//button[contains(@class, "kat-button--primary") and contains(@class, "kat-button--base")]'))
+            submit_button = wait_for(
+                driver,
+                EC.element_to_be_clickable((By.XPATH, '//button[contains(@class, "kat-button--primary") and contains(@class, "kat-button--base")]')),
+                'account_submit'
             )
             submit_button.click()
             INFO("Submit button clicked.")
@@ -124,358 +1069,1557 @@ def select_client_account(driver, account_name):
             logging.warning(f"Submit button not found or failed to click: {e}")
 
         INFO(f"Account {account_name} selected and submitted successfully.")
+        return True
     except Exception as e:
+        raise_if_transient(driver, 'account_selection', e)
         ERROR(f"Error selecting account {account_name}: {e}")
+        return False
 
 def check_developer_profile_alert(driver):
     """Vérifiez si une alerte de profil développeur est présente sur la page."""
+    alert_locator = (By.XPATH, "//div[contains(text(), 'You need to complete your Developer Profile')]")
     try:
-        alert_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//div[contains(text(), 'You need to complete your Developer Profile')]"))
-        )
-        return True if alert_element else False
+        # Attendre l'alerte ou la fin du chargement de la page, plutôt que 10s sans alerte
+        wait_for(driver, page_loaded_or_present(alert_locator), 'profile_alert')
+        return bool(driver.find_elements(*alert_locator))
     except (NoSuchElementException, TimeoutException):
         return False
 
 def close_modal_if_open(driver):
     try:
         # Vérifiez si un modal est ouvert
-        modal = driver.find_elements(By.CSS_SELECTOR, "kat-modal[role='dialog'][aria-modal='true']")
+        modal_locator = (By.CSS_SELECTOR, "kat-modal[role='dialog'][aria-modal='true']")
+        modal = driver.find_elements(*modal_locator)
         if modal:
-            close_button = modal[0].find_element(By.CSS_SELECTOR, "button.close")
-            driver.execute_script("arguments[0].click();", close_button)
+            # Le bouton de fermeture peut être dans le DOM du modal ou dans son shadow root
+            driver.execute_script(
+                "var close = arguments[0].querySelector('button.close')"
+                " || (arguments[0].shadowRoot && arguments[0].shadowRoot.querySelector('button.close'));"
+                " if (close) { close.click(); }",
+                modal[0]
+            )
             logging.info("Modal fermé avant de continuer.")
-            time.sleep(2)  # Attendre que le modal se ferme avant de cliquer à nouveau
+            wait_for(driver, modal_detached(modal_locator), 'modal_close')  # Attendre que le modal se ferme avant de cliquer à nouveau
     except Exception as e:
         logging.warning(f"Erreur lors de la fermeture du modal: {e}")
 
-def find_application_by_client_id(driver, client_id):
+APPLICATION_ROWS_XPATH = "/html/body/div[1]/div[2]/div/div/div/div/div/kat-tabs/kat-tab[1]/div[4]/kat-table[2]/kat-table-body/kat-table-row"
+
+# Résout les lignes du tableau des applications (XPath historique, sinon #applicationTableBody)
+_APPLICATION_ROWS_JS = """
+var snapshot = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var rows = [];
+for (var i = 0; i < snapshot.snapshotLength; i++) { rows.push(snapshot.snapshotItem(i)); }
+if (!rows.length) {
+    var body = document.getElementById('applicationTableBody');
+    rows = body ? Array.from(body.querySelectorAll('kat-table-row')) : [];
+}
+"""
+
+# Un seul appel : pour chaque ligne, les ClientID visibles dans son texte ou ses attributs
+APPLICATION_SCAN_SCRIPT = _APPLICATION_ROWS_JS + """
+var pattern = /amzn1\\.application-oa2-client\\.[0-9a-z]+/gi;
+return rows.map(function (row) {
+    var found = row.textContent.match(pattern) || [];
+    row.querySelectorAll('*').forEach(function (el) {
+        Array.from(el.attributes).forEach(function (attr) {
+            found = found.concat(attr.value.match(pattern) || []);
+        });
+    });
+    return Array.from(new Set(found));
+});
+"""
+
+# Clique le lien "View" de la ligne d'index donné
+APPLICATION_OPEN_SCRIPT = _APPLICATION_ROWS_JS + """
+var row = rows[arguments[1]];
+if (!row) { return false; }
+var link = row.querySelector('kat-table-cell:nth-of-type(3) kat-link') || row.querySelector('kat-link');
+if (!link) { return false; }
+link.click();
+return true;
+"""
+
+# Lecture du modal d'application en un appel : déplie le kat-expander (une fois) puis lit ClientID, clé et expiration
+MODAL_READ_SCRIPT = """
+var modal = document.querySelector("kat-modal[role='dialog'][visible='true']");
+if (!modal) { return null; }
+var expander = modal.querySelector('kat-expander');
+if (expander && expander.shadowRoot && !expander.hasAttribute('expanded') && !expander.dataset.autoExpanded) {
+    var toggle = expander.shadowRoot.querySelector('div.wrapper > button > div.header__toggle > slot > kat-icon')
+        || expander.shadowRoot.querySelector('button');
+    if (toggle) { toggle.click(); expander.dataset.autoExpanded = '1'; }
+}
+var clientId = modal.querySelector('#clientIdInput');
+var secret = modal.querySelector('.clientSecretDiv kat-input');
+var expiration = modal.querySelector('span > div > i');
+return {
+    clientId: clientId ? (clientId.value || clientId.getAttribute('value')) : null,
+    secret: secret ? (secret.getAttribute('value') || secret.value || null) : null,
+    expiration: expiration ? expiration.textContent.trim() : null,
+    lang: document.documentElement.lang || navigator.language || ''
+};
+"""
+
+# Noms de mois des interfaces Vendor Central (sans accents), pour les dates écrites en toutes lettres
+MONTH_NAMES = {
+    1: ('january', 'janvier', 'januar', 'enero', 'gennaio', 'januari', 'styczen', 'stycznia'),
+    2: ('february', 'fevrier', 'februar', 'febrero', 'febbraio', 'februari', 'luty', 'lutego'),
+    3: ('march', 'mars', 'marz', 'marzo', 'maart', 'marzec', 'marca'),
+    4: ('april', 'avril', 'abril', 'aprile', 'kwiecien', 'kwietnia'),
+    5: ('may', 'mai', 'mayo', 'maggio', 'mei', 'maj', 'maja'),
+    6: ('june', 'juin', 'juni', 'junio', 'giugno', 'czerwiec', 'czerwca'),
+    7: ('july', 'juillet', 'juli', 'julio', 'luglio', 'lipiec', 'lipca'),
+    8: ('august', 'aout', 'agosto', 'augustus', 'augusti', 'sierpien', 'sierpnia'),
+    9: ('september', 'septembre', 'septiembre', 'settembre', 'wrzesien', 'wrzesnia'),
+    10: ('october', 'octobre', 'oktober', 'octubre', 'ottobre', 'pazdziernik', 'pazdziernika'),
+    11: ('november', 'novembre', 'noviembre', 'listopad', 'listopada'),
+    12: ('december', 'decembre', 'dezember', 'diciembre', 'dicembre', 'grudzien', 'grudnia'),
+}
+
+def month_from_name(word):
+    """Numéro du mois d'un nom complet ou abrégé (« janv. », « Dez »), ou None s'il est inconnu ou ambigu."""
+    word = word.rstrip('.')
+    if len(word) < 3:
+        return None
+    months = {month for month, names in MONTH_NAMES.items() if any(name.startswith(word) for name in names)}
+    return months.pop() if len(months) == 1 else None
+
+def parse_expiration_date(text, lang=''):
+    """Date 'YYYY-MM-DD' contenue dans le texte d'expiration du modal, quels que soient la langue et le format.
+
+    Formats reconnus : ISO (avec ou sans heure), AAAA/MM/JJ, JJ/MM/AAAA (MM/JJ/AAAA
+    pour une page en anglais américain, ou quand le jour ne peut être que le
+    second nombre) et les dates en toutes lettres (« 5 janvier 2027 »,
+    « January 5, 2027 », « 5. Dez. 2027 »). Retourne None si aucune date n'est lisible.
+    """
+    if not text:
+        return None
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+    candidates = []
+    match = re.search(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})', text)
+    if match:
+        candidates.append((int(match[1]), int(match[2]), int(match[3])))
+    match = re.search(r'(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})', text)
+    if match:
+        first, second, year = int(match[1]), int(match[2]), int(match[3])
+        month_first = second > 12 or (first <= 12 and lang.lower() in ('en', 'en-us'))
+        candidates.append((year, first, second) if month_first else (year, second, first))
+    for word in re.finditer(r'[a-z]+\.?', text):
+        month = month_from_name(word[0])
+        if month is None:
+            continue
+        # Le jour et l'année sont accolés au mois (« 5 janvier 2027 », « 5 de enero de 2027 », « January 5, 2027 ») :
+        # un autre nombre du texte, ou un jour de la semaine comme « mar. », n'est pas pris pour une date
+        after = re.match(r'\s*(?:(\d{1,2})(?:st|nd|rd|th)?(?:,\s*|\s+))?(?:de\s+)?(\d{4})\b', text[word.end():])
+        if after is None:
+            continue
+        before = re.search(r'(?<!\d)(\d{1,2})(?:st|nd|rd|th|er)?\.?\s*(?:de\s+)?$', text[:word.start()])
+        day = after[1] or (before[1] if before else None)
+        if day:
+            candidates.append((int(after[2]), month, int(day)))
+            break
+    for year, month, day in candidates:
+        try:
+            return datetime(year, month, day).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+class ApplicationModal:
+    """Page object du modal d'application : chaque lecture est un seul aller-retour WebDriver.
+
+    Le script déplie le kat-expander au premier passage et renvoie ensemble le
+    ClientID, la clé secrète et le texte d'expiration ; l'expiration est
+    normalisée en 'YYYY-MM-DD' côté Python.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def read(self):
+        """Contenu du modal visible ({clientId, secret, expiration, expiration_text}) ou None s'il est fermé."""
+        content = self.driver.execute_script(MODAL_READ_SCRIPT)
+        if not content:
+            return None
+        content['expiration_text'] = content.get('expiration')
+        content['expiration'] = parse_expiration_date(content['expiration_text'], content.get('lang') or '')
+        return content
+
+    def wait_for_fields(self, step, *fields):
+        """Attend que le modal affiche tous les champs demandés ; retourne son contenu."""
+        def _ready(driver):
+            content = self.read()
+            return content if content and all(content.get(field) for field in fields) else False
+        return wait_for(self.driver, _ready, step)
+
+# ClientID -> index de ligne dans la console développeur, par compte vendeur
+_application_rows = {}
+
+def scan_application_rows(driver):
+    """Lit en un passage les ClientID affichés dans chaque ligne du tableau des applications."""
+    rows = driver.execute_script(APPLICATION_SCAN_SCRIPT, APPLICATION_ROWS_XPATH)
+    logging.info(f"Scanned {len(rows)} application rows.")
+    return rows
+
+@traced('modal_open')
+def open_application_row(driver, row_index):
+    """Ouvre le modal de la ligne donnée et retourne le ClientID qu'il affiche."""
+    if not driver.execute_script(APPLICATION_OPEN_SCRIPT, APPLICATION_ROWS_XPATH, row_index):
+        raise NoSuchElementException(f"No View link for application row {row_index}")
+    logging.info(f"Clicked View button for application row {row_index}")
+
+    # Attendre le modal et son ID client ; la lecture déplie aussi l'expander de la clé secrète
+    found_client_id = ApplicationModal(driver).wait_for_fields('modal_open', 'clientId')['clientId']
+    logging.info(f"ClientID trouvé: {found_client_id}")
+    return found_client_id
+
+@traced('app_lookup')
+def find_application_by_client_id(driver, client_id, account_name=None):
+    """Ouvre le modal de l'application du ClientID donné et affiche sa clé secrète.
+
+    Les ClientID de toutes les lignes sont lus en un seul appel. S'ils ne sont
+    visibles que dans les modals, chaque modal est ouvert une seule fois et la
+    correspondance ClientID -> ligne est mise en cache pour le compte vendeur.
+    """
     try:
-        driver.get('https://vendorcentral.amazon.fr/sellingpartner/developerconsole?ref_=vc_xx_subNav')
-        WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.ID, 'applicationTableBody')))
-
-        for row_index in range(1, 5):  # Exécute sur les quatre premières lignes (ajuster si nécessaire)
+        driver.get(vendor_url(driver, DEVELOPER_CONSOLE_PATH))
+        wait_for(driver, EC.visibility_of_element_located((By.ID, 'applicationTableBody')), 'console_table')
+
+        rows_by_client_id = _application_rows.setdefault(account_name, {}) if account_name else {}
+        row_index = rows_by_client_id.get(client_id)
+        if row_index is not None:
+            # Ligne connue : l'ouvrir directement
+            if open_application_row(driver, row_index) == client_id:
+                return True
+            logging.warning(f"Cached row {row_index} no longer holds ClientID {client_id}, rescanning.")
+            rows_by_client_id.clear()
+            close_modal_if_open(driver)
+
+        row_ids = scan_application_rows(driver)
+        for index, ids in enumerate(row_ids):
+            for found_client_id in ids:
+                rows_by_client_id[found_client_id] = index
+
+        row_index = rows_by_client_id.get(client_id)
+        if row_index is not None:
+            if open_application_row(driver, row_index) == client_id:
+                logging.info(f"Le ClientID correspond pour le compte: {client_id}")
+                return True
+            close_modal_if_open(driver)
+
+        # Le ClientID n'apparaît que dans les modals : ouvrir une fois chaque ligne non identifiée
+        known_rows = set(rows_by_client_id.values())
+        for index in range(len(row_ids)):
+            if index in known_rows:
+                continue
             try:
                 close_modal_if_open(driver)
-                view_button_xpath = f"/html/body/div[1]/div[2]/div/div/div/div/div/kat-tabs/kat-tab[1]/div[4]/kat-table[2]/kat-table-body/kat-table-row[{row_index}]/kat-table-cell[3]/div/kat-link"
-                view_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, view_button_xpath)))
-                view_button.click()
-                logging.info(f"Clicked View button for application row {row_index}")
-
-                # Attendre que le modal soit visible
-                WebDriverWait(driver, 10).until(
-                    EC.visibility_of_element_located((By.CSS_SELECTOR, "kat-modal[role='dialog'][aria-modal='true']"))
-                )
-
-                # Accéder au Shadow DOM pour le modal
-                shadow_host = driver.find_element(By.CSS_SELECTOR, "kat-modal[role='dialog'][aria-modal='true']")
-                shadow_root = driver.execute_script("return arguments[0].shadowRoot", shadow_host)
-
-                # Localiser et extraire l'ID client depuis le modal
-                client_id_element = WebDriverWait(driver, 10).until(
-                    EC.visibility_of_element_located((By.ID, "clientIdInput"))
-                )
-                found_client_id = client_id_element.get_attribute("value")
-                logging.info(f"ClientID trouvé: {found_client_id}")
+                found_client_id = open_application_row(driver, index)
+                rows_by_client_id[found_client_id] = index
 
                 if found_client_id == client_id:
                     logging.info(f"Le ClientID correspond pour le compte: {client_id}")
-
-                    # Appeler la fonction pour cliquer sur la flèche et afficher la clé secrète
-                    click_arrow(driver)
-
                     return True
-                else:
-                    close_button = shadow_root.find_element(By.CSS_SELECTOR, "button.close")
-                    driver.execute_script("arguments[0].click();", close_button)
-                    logging.info("Modal closed.")
-                    time.sleep(2)
             except Exception as e:
-                logging.error(f"Erreur lors de la vérification du ClientID pour l'application à la ligne {row_index}: {e}")
+                raise_if_transient(driver, 'app_lookup', e)
+                logging.error(f"Erreur lors de la vérification du ClientID pour l'application à la ligne {index}: {e}")
                 continue
 
+        close_modal_if_open(driver)
         logging.warning(f"Aucun profil d'application trouvé pour le ClientID: {client_id}")
         return False
     except Exception as e:
+        raise_if_transient(driver, 'app_lookup', e)
         logging.error(f"Erreur lors de la recherche du ClientID: {e}")
         return False
 
-def click_view_button(driver, account_name, report_data):
-    try:
-        driver.get('https://vendorcentral.amazon.fr/sellingpartner/developerconsole?ref_=vc_xx_subNav')
-        time.sleep(2)
-        if check_developer_profile_alert(driver):
-            report_data.append([account_name, "N/A", "Client needs to complete their Developer Profile", "N/A", "N/A", "N/A", "N/A"])
-            return
-
-        WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.ID, 'applicationTableBody')))
-
-        logging.info("Attempting to click the view link...")
-        view_link = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '/html/body/div[1]/div[2]/div/div/div/div/div/kat-tabs/kat-tab[1]/div[4]/kat-table[2]/kat-table-body/kat-table-row/kat-table-cell[3]/div/kat-link'))
-        )
-        view_link.click()
-        logging.info("View link clicked.")
-
-    except Exception as e:
-        logging.error(f"An error occurred while clicking view link: {e}")
-
-def click_arrow(driver):
-    """Click on the arrow to display the secret key."""
-    try:
-        modal_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "kat-modal[role='dialog'][aria-modal='true'][visible='true']"))
-        )
-        INFO("Modal visible")
-
-        shadow_host = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "kat-modal[role='dialog'][aria-modal='true'][visible='true'] > span:nth-child(2) > kat-expander"))
-        )
-        INFO("Shadow host visible")
-
-        shadow_root = driver.execute_script("return arguments[0].shadowRoot", shadow_host)
-        if shadow_root:
-            logging.info("Shadow root visible")
-            kat_icon = shadow_root.find_element(By.CSS_SELECTOR, "div.wrapper > button > div.header__toggle > slot > kat-icon")
-            kat_icon.click()
-            logging.info("Kat icon clicked successfully.")
-        else:
-            WARNING("Shadow root not found.")
-    except Exception as e:
-        ERROR(f"An error occurred: {e}")
-
+@traced('extraction', failed=lambda result: None in result)
 def extract_secret_key_and_expiration(driver):
+    """Lit la clé secrète et la date d'expiration ('YYYY-MM-DD') du modal ouvert."""
     try:
         INFO("Attempting to copy the client secret...")
-
-        # Attendre que le modal soit visible
-        modal_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "kat-modal[role='dialog'][visible='true']"))
-        )
-        INFO("Modal visible")
-
-        secret_div = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".clientSecretDiv kat-input"))
-        )
-
-        # Obtenir la valeur du secret client
-        client_secret = secret_div.get_attribute("value")
-
-        if client_secret:
-            logging.info(f"Client secret successfully copied: {client_secret}")
-        else:
-            logging.error("Client secret is empty.")
-
-        # Vérification de la date d'expiration
-        logging.info("Attempting to verify the expiration date of the client secret...")
-
-        # Attendre que la date d'expiration soit visible dans le modal
-        expiration_span = WebDriverWait(modal_element, 10).until(
-            EC.presence_of_element_located((By.XPATH, ".//span/div/i"))
-        )
-        logging.info("Expiration span found")
-
-        # Obtenir la date d'expiration
-        expiration_date_text = expiration_span.text
-        expiration_date_str = expiration_date_text.split(":")[1].strip() if expiration_date_text else None
-
-        if expiration_date_str:
-            # Extraire uniquement la date au format YYYY-MM-DD
-            expiration_date_formatted = expiration_date_str.split('T')[0]
-            logging.info(f"Expiration date successfully extracted: {expiration_date_formatted}")
-        else:
-            logging.error("Expiration date is empty.")
-            expiration_date_formatted = None
-
-        return client_secret, expiration_date_formatted  # Retourner les deux valeurs
-
+        content = ApplicationModal(driver).wait_for_fields('extraction', 'secret', 'expiration_text')
     except Exception as e:
+        raise_if_transient(driver, 'extraction', e)
         logging.error(f"Error extracting client secret and expiration: {str(e)}")
         return None, None  # Retourner None si une erreur se produit
 
-def renew_secret_and_extract(driver, account_name, report_data):
-    """Renew the secret and extract the new secret and expiration date."""
+    client_secret = content['secret']
+    register_secret(client_secret)
+    logging.info("Client secret successfully copied.")
+    expiration_date = content['expiration']
+    if expiration_date:
+        logging.info(f"Expiration date successfully extracted: {expiration_date}")
+    else:
+        logging.error(f"Unreadable expiration date: {content['expiration_text']!r}")
+    return client_secret, expiration_date
+
+def renewal_displayed(previous_secret, previous_expiration_text):
+    """Condition : la clé et le texte d'expiration du modal ouvert ont tous deux changé ; retourne son contenu.
+
+    La clé peut être remplacée avant l'expiration : attendre la seule clé
+    ferait lire l'ancienne date.
+    """
+    def _predicate(driver):
+        content = ApplicationModal(driver).read()
+        if not content or not content.get('secret') or not content.get('expiration_text'):
+            return False
+        if content['secret'] == previous_secret or content['expiration_text'] == previous_expiration_text:
+            return False
+        return content
+    return _predicate
+
+def days_until(expiration_date):
+    """Jours restants avant une date d'expiration 'YYYY-MM-DD' (None si absente ou illisible)."""
+    if not expiration_date:
+        return None
+    try:
+        return (datetime.fromisoformat(expiration_date[:10]) - datetime.now()).days
+    except ValueError:
+        logging.error(f"Unreadable expiration date: {expiration_date}")
+        return None
+
+def reopen_application(driver, client_id, account_name):
+    """Rouvre le modal de la ligne déjà identifiée pour ce ClientID, sans recharger la console."""
+    row_index = _application_rows.get(account_name, {}).get(client_id)
+    if row_index is not None:
+        close_modal_if_open(driver)
+        if open_application_row(driver, row_index) == client_id:
+            return True
+        logging.warning(f"Application row {row_index} no longer holds ClientID {client_id}, searching the console again.")
+    return find_application_by_client_id(driver, client_id, account_name)
+
+@traced('renewal', failed=lambda result: None in result[:2])
+def renew_secret_and_extract(driver, account_name, client_id, previous_secret):
+    """Renouvelle la clé dans le modal ouvert ; retourne (nouvelle clé, nouvelle expiration, jours restants, confirmé).
+
+    La nouvelle clé est lue dans le modal resté ouvert dès qu'elle remplace
+    l'ancienne. Si le modal s'est fermé, la ligne de cette application (connue
+    depuis la recherche) est rouverte : la console n'est pas rechargée et le
+    rapport porte toujours sur l'application renouvelée. Une fois le
+    renouvellement confirmé, aucun échec n'est reporté : réessayer le compte
+    renouvellerait la clé une seconde fois.
+    """
+    confirmed = False
     try:
-        # Attendez que le modal de renouvellement soit visible
-        modal_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "kat-modal[role='dialog'][aria-modal='true'][visible='true']"))
-        )
+        # Attendez que le modal de renouvellement soit visible, avec l'expiration en vigueur
+        previous_expiration_text = ApplicationModal(driver).wait_for_fields('modal_open', 'expiration_text')['expiration_text']
         logging.info("Renewal modal is visible")
 
         # Cliquez sur le bouton de renouvellement
-        renew_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "kat-button.footerLeftButton[variant='primary']"))
-        )
+        renew_button = wait_for(driver, EC.element_to_be_clickable((By.CSS_SELECTOR, "kat-button.footerLeftButton[variant='primary']")), 'renew_button')
         renew_button.click()
         logging.info("Renew secret button clicked")
 
         # Attendez que le bouton de confirmation soit visible
-        confirm_button = WebDriverWait(driver, 10).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, "kat-button.footerConfirmationButton"))
-        )
+        confirm_button = wait_for(driver, EC.visibility_of_element_located((By.CSS_SELECTOR, "kat-button.footerConfirmationButton")), 'confirm_button')
         confirm_button.click()
+        confirmed = True
         logging.info("Confirmation button clicked")
 
-        # Cliquez sur le bouton 'Terminé' sans utiliser l'attribut 'label'
-        done_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "kat-button.footerRightButton"))
-        )
-        done_button.click()
-        logging.info("Done button clicked.")
-
-        # Cliquez à nouveau sur le bouton 'View' pour afficher le modal
-        click_view_button(driver, account_name, report_data)
-
-        # Attendez que le modal soit visible
-        WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.CSS_SELECTOR, "kat-modal")))
+        # Lire la nouvelle clé dans le modal dès que la clé et l'expiration ont toutes deux été remplacées
+        new_client_secret = new_expiration_date = None
+        try:
+            content = wait_for(driver, renewal_displayed(previous_secret, previous_expiration_text), 'renewed_secret')
+            new_client_secret, new_expiration_date = content['secret'], content['expiration']
+            register_secret(new_client_secret)
+            logging.info("New secret displayed in the open modal.")
+            if not new_expiration_date:
+                logging.error(f"Unreadable expiration date: {content['expiration_text']!r}")
+        except TimeoutException:
+            logging.info("New secret and expiration not displayed in the modal.")
 
-        # Cliquez sur la flèche pour afficher la clé secrète
-        click_arrow(driver)
+        # Cliquez sur le bouton 'Terminé' sans utiliser l'attribut 'label'
+        try:
+            done_button = wait_for(driver, EC.element_to_be_clickable((By.CSS_SELECTOR, "kat-button.footerRightButton")), 'done_button')
+            done_button.click()
+            logging.info("Done button clicked.")
+        except TimeoutException:
+            if new_client_secret is None:
+                raise
+            logging.warning("Done button not found after renewal, the new secret was already read.")
+
+        if new_client_secret is None or new_client_secret == previous_secret:
+            # Le modal s'est fermé : rouvrir la ligne de cette application
+            logging.info(f"Reopening the application {client_id} to read the renewed secret.")
+            if not reopen_application(driver, client_id, account_name):
+                return None, None, None, confirmed
+            new_client_secret, new_expiration_date = extract_secret_key_and_expiration(driver)
+
+        days_until_new_expiration = days_until(new_expiration_date)
+        logging.info(f"Secret renewed for {account_name}: new expiration {new_expiration_date} ({days_until_new_expiration} days)")
+        return new_client_secret, new_expiration_date, days_until_new_expiration, confirmed
 
-        # Extraire le nouveau client secret et la nouvelle date d'expiration
-        new_client_secret, new_expiration_date = extract_secret_key_and_expiration(driver)
+    except Exception as e:
+        if not confirmed:
+            raise_if_transient(driver, 'renewal', e)
+        logging.error(f"Error during secret renewal{' (after confirmation)' if confirmed else ''}: {e}")
+        return None, None, None, confirmed
+
+REPORT_HEADERS = [
+    "Client Name",
+    "Client ID",
+    "Current Secret Key",
+    "Current Expiration Date",
+    "Days until Current Expiration",
+    "New Secret Key",
+    "New Expiration Date",
+    "Days until New Expiration",
+    "Renewal Status",
+    "Region",
+]
+
+def expiration_columns(row):
+    """Retourne les colonnes (date, jours) de l'expiration en vigueur : la nouvelle si la clé a été renouvelée."""
+    if len(row) > 7 and row[6] not in (None, "N/A"):
+        return 6, 7
+    return 3, 4
+
+class XlsxReportSink:
+    """Rapport Excel en mode write-only : les lignes sont écrites au fil de l'eau, sans garder le classeur en mémoire."""
+
+    def __init__(self, path):
+        from openpyxl.styles import PatternFill
+        from openpyxl.workbook import Workbook
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Secret Key Report")
+        self.sheet.append(REPORT_HEADERS)
+        # Styles partagés par toutes les cellules colorées du rapport
+        self.red_fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
+        self.green_fill = PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid")
+
+    def write(self, row):
+        from openpyxl.cell import WriteOnlyCell
+
+        cells = [WriteOnlyCell(self.sheet, value=value) for value in row]
+        date_column, days_column = expiration_columns(row)
+        days_until_expiration = row[days_column] if days_column < len(row) else None
+        if isinstance(days_until_expiration, int):
+            fill_color = self.red_fill if days_until_expiration <= RENEWAL_THRESHOLD_DAYS else self.green_fill
+            # Colorer la date d'expiration et le nombre de jours restants
+            cells[date_column].fill = fill_color
+            cells[days_column].fill = fill_color
+        self.sheet.append(cells)
+
+    def write_summary(self, headers, rows, title="Step Summary"):
+        sheet = self.workbook.create_sheet(title)
+        sheet.append(headers)
+        for row in rows:
+            sheet.append(row)
+
+    def flush(self):
+        pass  # Un classeur write-only ne peut être enregistré qu'une fois, à la fermeture
+
+    def close(self):
+        self.workbook.save(self.path)
+
+class CsvReportSink:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(REPORT_HEADERS)
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def write_summary(self, headers, rows, title=None):
+        pass  # Les synthèses sont exportées dans le fichier de trace JSON
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+class JsonlReportSink:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row):
+        self.file.write(json.dumps(dict(zip(REPORT_HEADERS, row)), ensure_ascii=False, default=str) + '\n')
+
+    def write_summary(self, headers, rows, title=None):
+        pass  # Les synthèses sont exportées dans le fichier de trace JSON
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+REPORT_SINKS = {
+    'xlsx': XlsxReportSink,
+    'csv': CsvReportSink,
+    'jsonl': JsonlReportSink,
+}
+
+class ReportWriter:
+    """Diffuse chaque ligne du rapport vers tous les formats demandés (xlsx, csv, jsonl)."""
+
+    def __init__(self, formats=None, flush_every=None):
+        current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
+        base_path = os.path.splitext(REPORT_PATH_TEMPLATE.format(current_time))[0]
+        self.flush_every = REPORT_FLUSH_EVERY if flush_every is None else flush_every
+        self.rows_written = 0
+        self.sinks = []
+        self._lock = threading.Lock()
+        for fmt in formats or REPORT_FORMATS:
+            if fmt not in REPORT_SINKS:
+                logging.warning(f"Unknown report format ignored: {fmt}")
+                continue
+            self.sinks.append(REPORT_SINKS[fmt](f"{base_path}.{fmt}"))
+            logging.info(f"Creating report at {base_path}.{fmt}")
+
+    @property
+    def filenames(self):
+        return [sink.path for sink in self.sinks]
+
+    def write_row(self, row):
+        with self._lock:
+            for sink in self.sinks:
+                sink.write(row)
+            self.rows_written += 1
+            # Une nouvelle clé n'existe nulle part ailleurs (le journal la masque) : l'écrire sur disque sans attendre
+            renewed = len(row) > 5 and row[5] not in (None, "N/A")
+            if renewed or (self.flush_every and self.rows_written % self.flush_every == 0):
+                for sink in self.sinks:
+                    sink.flush()
+
+    def write_summary(self, headers, rows, title="Step Summary"):
+        with self._lock:
+            for sink in self.sinks:
+                sink.write_summary(headers, rows, title)
+
+    def close(self):
+        with self._lock:
+            for sink in self.sinks:
+                sink.close()
+        return self.filenames
+
+class OrderedRowEmitter:
+    """Transmet les lignes au writer dans l'ordre des comptes, dès que les comptes précédents sont terminés."""
+
+    def __init__(self, results, writer):
+        self.results = results
+        self.writer = writer
+        self.next_index = 0
+        self._lock = threading.Lock()
+
+    def emit_ready(self, total=None):
+        """Écrit les résultats contigus disponibles ; avec ``total``, écrit aussi ceux qui suivent un compte manquant."""
+        with self._lock:
+            last = total if total is not None else self.next_index
+            while self.next_index in self.results or self.next_index < last:
+                for row in self.results.get(self.next_index, []):
+                    self.writer.write_row(row)
+                self.next_index += 1
+
+def create_report(report_data, formats=None):
+    """Create the report files and return the filename of the first one."""
+    writer = ReportWriter(formats)
+    for row in report_data:
+        writer.write_row(row)
+    filenames = writer.close()
+    return filenames[0] if filenames else None  # Return the filename to be used later
+
+SECRET_COLUMNS = (2, 5)  # "Current Secret Key" et "New Secret Key" dans les lignes du rapport
+REDACTED = '[REDACTED]'
+
+def redact_row(row):
+    """Masque les clés secrètes d'une ligne du rapport (les messages et 'N/A' sont conservés)."""
+    redacted = list(row)
+    for column in SECRET_COLUMNS:
+        value = redacted[column] if column < len(redacted) else None
+        if isinstance(value, str) and value != 'N/A' and ' ' not in value.strip():
+            redacted[column] = REDACTED
+    return redacted
+
+def journal_key(account):
+    return f"{account['AccountName']}|{account['ClientID']}"
+
+class CheckpointJournal:
+    """Journal JSONL en ajout seul : un enregistrement écrit et fsync'é par compte terminé."""
+
+    def __init__(self, path, include_secrets=False):
+        self.path = path
+        self.include_secrets = include_secrets
+        self._lock = threading.Lock()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        self._file = os.fdopen(fd, 'a+', encoding='utf-8')
+        # Un crash pendant une écriture laisse une ligne incomplète : repartir sur une nouvelle ligne
+        if self._file.tell() > 0:
+            self._file.seek(self._file.tell() - 1)
+            if self._file.read(1) != '\n':
+                self._file.write('\n')
+
+    def record(self, account, rows):
+        entry = {
+            'key': journal_key(account),
+            'account': account['AccountName'],
+            'client_id': account['ClientID'],
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': rows if self.include_secrets else [redact_row(row) for row in rows],
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+def load_journal(path):
+    """Charge le journal : clé de compte -> enregistrement. Une dernière ligne tronquée (crash) est ignorée."""
+    entries = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logging.warning(f"Ignoring unreadable journal line {line_number} in {path}")
+                    continue
+                entries[entry['key']] = entry
+    except FileNotFoundError:
+        pass
+    return entries
+
+def open_journal(resume):
+    """Ouvre le journal de l'exécution ; hors reprise, l'ancien journal est conservé en .prev."""
+    if not resume and os.path.exists(JOURNAL_PATH):
+        os.replace(JOURNAL_PATH, f"{JOURNAL_PATH}.prev")
+    return CheckpointJournal(JOURNAL_PATH, include_secrets=JOURNAL_INCLUDE_SECRETS)
+
+REDACTED_RENEWAL_STATUS = "Renewed, new secret redacted in journal: re-read it in the console"
+
+def journal_rows(entry):
+    """Lignes d'un enregistrement du journal pour le rapport.
+
+    Une clé renouvelée dont la valeur a été masquée n'est connue que de la
+    console : la ligne ne doit pas passer pour un renouvellement réussi.
+    """
+    rows = []
+    for row in entry['rows']:
+        if len(row) > 8 and row[5] == REDACTED:
+            row = list(row)
+            row[8] = REDACTED_RENEWAL_STATUS
+        rows.append(row)
+    return rows
+
+def rows_from_journal(path):
+    """Reconstruit les lignes du rapport depuis le journal seul."""
+    return [row for entry in load_journal(path).values() for row in journal_rows(entry)]
+
+class StateStore:
+    """Base SQLite locale : dernière date d'expiration connue et date de vérification par ClientID."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS secrets ("
+                "client_id TEXT PRIMARY KEY, "
+                "account_name TEXT, "
+                "expiration_date TEXT, "
+                "checked_at TEXT NOT NULL)"
+            )
 
-        # Vérifiez si la nouvelle date d'expiration est valide
-        if new_expiration_date:
-            # Compléter la chaîne de date si nécessaire
-            if len(new_expiration_date) < 10:  # "YYYY-MM-DD"
-                new_expiration_date += 'T00:00:00'  # Ajouter le temps par défaut
+    def get_all(self):
+        """Retourne ClientID -> (expiration_date, checked_at)."""
+        with self._lock:
+            rows = self._connection.execute("SELECT client_id, expiration_date, checked_at FROM secrets").fetchall()
+        return {client_id: (expiration_date, checked_at) for client_id, expiration_date, checked_at in rows}
+
+    def update(self, client_id, account_name, expiration_date):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO secrets (client_id, account_name, expiration_date, checked_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(client_id) DO UPDATE SET account_name = excluded.account_name, "
+                "expiration_date = excluded.expiration_date, checked_at = excluded.checked_at",
+                (client_id, account_name, expiration_date, datetime.now().isoformat(timespec='seconds'))
+            )
 
-            try:
-                # Convertir la date d'expiration au format datetime
-                new_expiration_datetime = datetime.fromisoformat(new_expiration_date.split('T')[0])  # Retirer l'heure
-                days_until_new_expiration = (new_expiration_datetime - datetime.now()).days
-            except ValueError as ve:
-                logging.error(f"Error parsing new expiration date: {ve}")
-                days_until_new_expiration = None
+    def record(self, account, rows):
+        """Enregistre l'expiration constatée dans les lignes du rapport d'un compte (la nouvelle si renouvelée)."""
+        for row in rows:
+            if len(row) < 9:
+                continue  # Ligne d'alerte (profil développeur), sans date d'expiration
+            expiration_date = row[6] if row[6] not in (None, 'N/A') else row[3]
+            if isinstance(expiration_date, str) and expiration_date[:10].count('-') == 2:
+                self.update(account['ClientID'], account['AccountName'], expiration_date[:10])
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+def plan_accounts(accounts, state_store, horizon_days=None, max_age_days=None):
+    """Sépare les comptes à visiter de ceux qu'on peut sauter d'après la base locale.
+
+    Un compte est visité s'il n'a jamais été vérifié, si sa dernière vérification
+    date de plus de ``max_age_days`` jours ou si sa clé expire dans moins de
+    ``horizon_days`` jours. Retourne les lignes du rapport des comptes sautés,
+    par clé de journal.
+    """
+    horizon_days = CHECK_HORIZON_DAYS if horizon_days is None else horizon_days
+    max_age_days = STATE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    known = state_store.get_all()
+    now = datetime.now()
+    skipped = {}
+    for account in accounts:
+        state = known.get(account['ClientID'])
+        if not state or not state[0]:
+            continue
+        expiration_date, checked_at = state
+        try:
+            days_until_expiration = (datetime.fromisoformat(expiration_date) - now).days
+            age_days = (now - datetime.fromisoformat(checked_at)).days
+        except ValueError:
+            continue
+        if days_until_expiration <= horizon_days or age_days >= max_age_days:
+            continue
+        skipped[journal_key(account)] = [[
+            account['AccountName'], account['ClientID'], "N/A", expiration_date, days_until_expiration,
+            "N/A", "N/A", "N/A", f"Skipped: expires in {days_until_expiration} days (checked {checked_at[:10]})",
+            account_region(account)
+        ]]
+    INFO(f"Schedule: {len(accounts) - len(skipped)} account(s) to check, {len(skipped)} skipped "
+         f"(horizon {horizon_days} days, max age {max_age_days} days)")
+    return skipped
+
+def process_account(driver, account, force_renewal=False):
+    """Traite un compte et retourne les lignes du rapport qui le concernent.
+
+    ``force_renewal`` renouvelle la clé quelle que soit son expiration.
+    """
+    account_name = account['AccountName']
+    target_client_id = account['ClientID']
+    region = account_region(account)
+    report_data = []
+    _trace_context.account = account_name
+
+    logging.info(f"Processing account: {account_name} (Client ID: {target_client_id}, region {region})")
+
+    # Sélectionner le compte du client
+    if not select_client_account(driver, account_name):
+        logging.warning(f"Account {account_name} could not be selected, skipping.")
+        return report_data
+
+    # Vérifier s'il y a une alerte sur le profil développeur
+    if check_developer_profile_alert(driver):
+        logging.warning("Developer profile alert detected. Handling the alert.")
+        # Ici, vous pouvez ajouter le code pour gérer l'alerte si nécessaire.
+
+    # Trouver l'application par son Client ID
+    if not find_application_by_client_id(driver, target_client_id, account_name):
+        logging.warning(f"No application found for ClientID: {target_client_id} in account {account_name}")
+        return report_data
+
+    # Extraire la clé secrète et la date d'expiration
+    client_secret, expiration_date = extract_secret_key_and_expiration(driver)
+    if client_secret is None or expiration_date is None:
+        logging.warning(f"Skipping account {account_name}, missing key or expiration date.")
+        return report_data
+
+    # Calculer les jours restants avant expiration
+    days_until_expiration = days_until(expiration_date)
+    logging.info(f"Days until expiration: {days_until_expiration} for {account_name}")
+
+    # Si la date d'expiration est inférieure au seuil (30 jours par défaut), renouveler la clé
+    renewal_due = force_renewal or (days_until_expiration is not None and days_until_expiration < RENEWAL_THRESHOLD_DAYS)
+    if renewal_due and AUDIT_ONLY:
+        logging.info(f"Renewal due for account {account_name}, not renewed (audit only)")
+        report_data.append([account_name, target_client_id, client_secret, expiration_date, days_until_expiration, "N/A", "N/A", "N/A", "Renewal due (audit only)", region])
+    elif renewal_due:
+        logging.info(f"Renewing secret for account: {account_name}")
+        new_client_secret, new_expiration_date, days_until_new_expiration, confirmed = renew_secret_and_extract(driver, account_name, target_client_id, client_secret)
+        if new_client_secret and new_expiration_date:
+            report_data.append([account_name, target_client_id, client_secret, expiration_date, days_until_expiration, new_client_secret, new_expiration_date, days_until_new_expiration, "Renewed successfully", region])
+        elif confirmed:
+            # L'ancienne clé n'est plus valide : à relire dans la console, surtout pas à renouveler de nouveau
+            report_data.append([account_name, target_client_id, client_secret, expiration_date, days_until_expiration, new_client_secret or "N/A", "N/A", "N/A", "Renewed, new secret unreadable", region])
         else:
-            days_until_new_expiration = None
+            report_data.append([account_name, target_client_id, client_secret, expiration_date, days_until_expiration, "N/A", "N/A", "N/A", "Renewal failed: new secret not found", region])
+    else:
+        report_data.append([account_name, target_client_id, client_secret, expiration_date, days_until_expiration, "N/A", "N/A", "N/A", "No renewal needed", region])
 
-        return new_client_secret, new_expiration_date
+    return report_data
 
+def quit_driver(driver):
+    """Ferme le WebDriver sans propager d'erreur (session déjà perdue, etc.)."""
+    try:
+        driver.quit()
     except Exception as e:
-        logging.error(f"Error during secret renewal: {e}")
-        return None, None
-
-def create_report(report_data):
-    """Create an Excel report and return the filename."""
-    current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-    report_filename = REPORT_PATH_TEMPLATE.format(current_time)
-    logging.info(f"Creating report at {report_filename}")
-
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Secret Key Report"
-
-    headers = [
-        "Client Name",
-        "Client ID",
-        "Current Secret Key",
-        "Current Expiration Date",
-        "Days until Current Expiration",
-        "New Secret Key",
-        "New Expiration Date",
-        "Days until New Expiration",
-        "Renewal Status"
-    ]
-    sheet.append(headers)
+        logging.warning(f"Error while closing WebDriver: {e}")
+
+def start_browser(worker_id, login_slots, region=None):
+    """Démarre un navigateur connecté à la région ; les connexions simultanées sont limitées par ``login_slots``."""
+    region = region or DEFAULT_REGION
+    with login_slots:
+        INFO(f"[worker {worker_id}] Starting browser session ({region}, {region_base_url(region)})")
+        driver = bind_region(setup_driver(), region)
+        try:
+            ensure_logged_in(driver)
+        except Exception:
+            quit_driver(driver)
+            raise
+    return driver
+
+def recycle_browser(driver, worker_id, login_slots, reason):
+    """Relance Chrome en gardant la session : cookies et localStorage sont copiés dans le nouveau navigateur.
+
+    La connexion complète n'est refaite que si la session copiée n'est plus
+    valide. Le worker reprend ensuite au compte suivant de sa file.
+    """
+    region = getattr(driver, 'region', None) or DEFAULT_REGION
+    rss_before = browser_rss(driver)
+    accounts = getattr(driver, 'accounts_processed', 0)
+    start = time.monotonic()
+    try:
+        session = capture_session(driver)
+    except WebDriverException as e:
+        WARNING(f"[worker {worker_id}] Session not captured before recycling: {e}")
+        session = None
+    quit_driver(driver)
 
-    # Écrire les données dans le rapport
-    for row in report_data:
-        sheet.append(row)
+    driver = bind_region(setup_driver(), region)
+    try:
+        if session is not None:
+            apply_session(driver, session)
+        relogin = session is None or not session_is_valid(driver)
+        if relogin:
+            WARNING(f"[worker {worker_id}] Session not carried over to the new browser, logging in again")
+            with login_slots:
+                ensure_logged_in(driver)
+    except Exception:
+        quit_driver(driver)
+        raise
+    rss_after = browser_rss(driver)
+    event = {
+        'time': round(time.time(), 3),
+        'worker': threading.current_thread().name,
+        'region': region,
+        'reason': reason,
+        'accounts': accounts,
+        'rss_before_mb': None if rss_before is None else round(rss_before / MIB, 1),
+        'rss_after_mb': None if rss_after is None else round(rss_after / MIB, 1),
+        'seconds': round(time.monotonic() - start, 2),
+        'relogin': relogin,
+    }
+    with _memory_lock:
+        RECYCLE_EVENTS.append(event)
+    INFO(f"[worker {worker_id}] Browser recycled ({reason}) in {event['seconds']:.1f}s"
+         + (f", RSS {event['rss_before_mb']:.0f} -> {event['rss_after_mb']:.0f} MiB" if rss_before and rss_after else ''))
+    return driver
+
+def run_worker(worker_id, account_queue, results, login_slots, deferred, breaker, journal=None, state_store=None, emitter=None,
+               region=None):
+    """Boucle d'un worker : un navigateur connecté qui consomme la file de comptes.
+
+    Un échec transitoire (timeout, élément périmé, modal détaché) place le
+    compte dans la file ``deferred``, réessayée au tour suivant. Une session
+    perdue déclenche une reconnexion sur place et un navigateur planté est
+    relancé : le worker ne s'arrête que si la connexion elle-même échoue, ou
+    quand le disjoncteur d'une étape est ouvert. Tous les comptes de la file
+    appartiennent à la région ``region``. Le navigateur est recyclé (session
+    conservée) quand sa mémoire ou son nombre de comptes dépasse le seuil.
+    """
+    driver = None
+    try:
+        driver = start_browser(worker_id, login_slots, region)
 
-        # Vérifiez la date d'expiration de la nouvelle clé secrète
-        new_expiration_date = row[5]  # Nouvelle date d'expiration
-        if new_expiration_date and new_expiration_date != "N/A":
+        while not STOP_EVENT.is_set() and not breaker.open_steps():
             try:
-                expiration_date = datetime.fromisoformat(new_expiration_date)
-                days_until_expiration = (expiration_date - datetime.now()).days
+                index, account, attempt = account_queue.get_nowait()
+            except queue.Empty:
+                return
 
-                logging.info(f"Checking expiration for {row[0]}: {new_expiration_date}, Days until expiration: {days_until_expiration}")
+            started = time.monotonic()
+            try:
+                rows = process_account(driver, account)
+            except TransientError as e:
+                WARNING(f"[worker {worker_id}] Attempt {attempt} for account {account['AccountName']} deferred: {e}")
+                deferred.put((index, account, attempt, e.step, str(e)))
+                breaker.record_failure(e.step)
+                if isinstance(e, SessionLostError):
+                    INFO(f"[worker {worker_id}] Session lost, logging in again")
+                    with login_slots:
+                        ensure_logged_in(driver)
+                continue
+            except WebDriverException as e:
+                ERROR(f"[worker {worker_id}] Browser crashed on account {account['AccountName']}: {e}")
+                deferred.put((index, account, attempt, 'browser', type(e).__name__))
+                breaker.record_failure('browser')
+                quit_driver(driver)
+                driver = None
+                driver = start_browser(worker_id, login_slots, region)
+                continue
+            except Exception as e:
+                ERROR(f"[worker {worker_id}] Account {account['AccountName']} failed: {e}")
+                results[index] = [failure_row(account, attempt, 'processing', e)]
+                if emitter is not None:
+                    emitter.emit_ready()
+                continue
 
-                if days_until_expiration <= 30:
-                    fill_color = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")  # Rouge
-                else:
-                    fill_color = PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid")  # Vert
+            results[index] = rows
+            breaker.record_success()
+            if journal is not None:
+                journal.record(account, rows)
+            if state_store is not None:
+                state_store.record(account, rows)
+            if emitter is not None:
+                emitter.emit_ready()
+
+            # Navigateur trop gros ou trop ancien : relancé entre deux comptes, sans nouvelle connexion
+            reason = recycle_reason(driver, sample_browser(driver, account['AccountName'], time.monotonic() - started))
+            if reason and not account_queue.empty():
+                previous, driver = driver, None
+                driver = recycle_browser(previous, worker_id, login_slots, reason)
+    except LoginError as e:
+        # Les autres workers et les tours suivants échoueraient de la même façon
+        ERROR(f"[worker {worker_id}] Login refused, stopping the run: {e}")
+        STOP_EVENT.set()
+    except (Exception, SystemExit) as e:
+        # setup_driver appelle sys.exit(1) : on ne tue que ce worker
+        if isinstance(e, TransientError):
+            breaker.record_failure(e.step)
+        ERROR(f"[worker {worker_id}] Worker stopped: {e}")
+    finally:
+        if driver is not None:
+            quit_driver(driver)
+        INFO(f"[worker {worker_id}] Browser session closed")
 
-                # Appliquer la couleur à la cellule de la date d'expiration
-                sheet.cell(row=sheet.max_row, column=6).fill = fill_color  # Nouvelle date d'expiration
-                # Optionnel : Appliquer la couleur à la cellule des jours jusqu'à l'expiration
-                sheet.cell(row=sheet.max_row, column=7).fill = fill_color  # Jours jusqu'à la nouvelle expiration
+def drain(work_queue):
+    items = []
+    while True:
+        try:
+            items.append(work_queue.get_nowait())
+        except queue.Empty:
+            return items
+
+def allocate_workers(counts, worker_count=None):
+    """Répartit au plus ``worker_count`` navigateurs entre les régions, au prorata de leurs comptes.
+
+    Chaque région reçoit un navigateur (l'appelant ne passe pas plus de
+    régions que de navigateurs), puis chaque navigateur restant va à la région
+    qui a le plus de comptes par navigateur, sans dépasser son nombre de comptes.
+    """
+    budget = max(1, worker_count or WORKER_COUNT)
+    allocation = {region: 1 for region in counts}
+    for _ in range(budget - len(allocation)):
+        candidates = [region for region in counts if allocation[region] < counts[region]]
+        if not candidates:
+            break
+        region = max(candidates, key=lambda name: counts[name] / allocation[name])
+        allocation[region] += 1
+    return allocation
+
+def run_round(items, results, login_slots, breakers, worker_count=None, journal=None, state_store=None, emitter=None):
+    """Un tour du pool de workers ; retourne (comptes différés, comptes non pris par un worker).
+
+    Les comptes sont groupés par région : chaque région a sa file, ses
+    navigateurs connectés à son domaine et son disjoncteur. Le nombre total de
+    navigateurs ne dépasse jamais ``WORKER_COUNT`` : s'il y a plus de régions
+    que de navigateurs, les régions sont traitées par vagues successives, les
+    plus chargées d'abord.
+    """
+    budget = max(1, worker_count or WORKER_COUNT)
+    by_region = {}
+    for item in items:
+        by_region.setdefault(account_region(item[1]), []).append(item)
+    regions = sorted(by_region, key=lambda region: -len(by_region[region]))
+    waves = [regions[start:start + budget] for start in range(0, len(regions), budget)]
+    queues = {}
+    deferred = queue.Queue()
+
+    for wave_number, wave in enumerate(waves, 1):
+        if STOP_EVENT.is_set():
+            break
+        allocation = allocate_workers({region: len(by_region[region]) for region in wave}, budget)
+        INFO(f"Processing {sum(len(by_region[region]) for region in wave)} accounts with {sum(allocation.values())} worker(s)"
+             + (f" (region wave {wave_number}/{len(waves)})" if len(waves) > 1 else '') + ": "
+             + ', '.join(f"{region} {len(by_region[region])} account(s)/{workers} worker(s)" for region, workers in allocation.items()))
+        executor = ThreadPoolExecutor(max_workers=sum(allocation.values()), thread_name_prefix="worker")
+        try:
+            for region in wave:
+                queues[region] = queue.Queue()
+                for item in by_region[region]:
+                    queues[region].put(item)
+                for worker_number in range(1, allocation[region] + 1):
+                    executor.submit(run_worker, f"{region}-{worker_number}", queues[region], results, login_slots, deferred,
+                                    breakers[region], journal, state_store, emitter, region)
+            executor.shutdown(wait=True)
+        except KeyboardInterrupt:
+            # Les workers terminent le compte en cours (journalisé) puis s'arrêtent : les attendre
+            # avant que l'appelant ne ferme le journal, le rapport et la base d'état
+            STOP_EVENT.set()
+            WARNING("Interrupted: finishing the accounts in progress before stopping...")
+            while True:
+                try:
+                    executor.shutdown(wait=True)
+                    break
+                except KeyboardInterrupt:
+                    WARNING("Still waiting for the accounts in progress; their results would be lost otherwise.")
+            raise
+
+    untried = [item for region_queue in queues.values() for item in drain(region_queue)]
+    untried += [item for region in regions if region not in queues for item in by_region[region]]
+    return drain(deferred), untried
+
+def process_accounts(accounts, worker_count=None, journal=None, completed=None, state_store=None, report_writer=None):
+    """Répartit les comptes sur un pool de workers et fusionne les résultats dans l'ordre du fichier Excel.
+
+    ``completed`` (clé de journal -> lignes) contient les comptes déjà terminés
+    lors d'une exécution précédente ou sautés par la planification : ils ne
+    sont pas retraités mais leurs lignes sont reprises dans le rapport.
+
+    Les comptes en échec transitoire sont réessayés par tours successifs, après
+    un backoff exponentiel qui s'allonge tant qu'aucun compte n'aboutit. Après
+    ``RETRY_MAX_ATTEMPTS`` tentatives, le compte est abandonné pour cette
+    exécution avec une ligne d'échec dans le rapport.
+    """
+    completed = completed or {}
+    results = {}
+    for index, account in enumerate(accounts):
+        if journal_key(account) in completed:
+            results[index] = completed[journal_key(account)]
+    items = [(index, accounts[index], 1) for index in range(len(accounts)) if index not in results]
+    emitter = OrderedRowEmitter(results, report_writer) if report_writer is not None else None
+    if emitter is not None:
+        emitter.emit_ready()
+    login_slots = threading.BoundedSemaphore(max(1, MAX_CONCURRENT_LOGINS))
+    breakers = {account_region(account): CircuitBreaker() for account in accounts}
+    last_failure = {}  # index -> étape du dernier échec transitoire
+    backoff_level = stalled_rounds = 0
+
+    while items:
+        held = []
+        for region, breaker in breakers.items():
+            open_steps = breaker.open_steps()
+            region_items = [item for item in items if account_region(item[1]) == region]
+            if not open_steps or not region_items:
+                continue
+            # Disjoncteur ouvert : un seul compte de la région sonde l'étape en échec
+            probe = next((item for item in region_items if last_failure.get(item[0]) in open_steps), region_items[0])
+            held += [item for item in region_items if item is not probe]
+            breaker.half_open()
+            INFO(f"Circuit breaker half-open for {region} {', '.join(sorted(open_steps))}: "
+                 f"probing with account {probe[1]['AccountName']}")
+        held_indexes = {item[0] for item in held}
+        items = [item for item in items if item[0] not in held_indexes]
+
+        # Sur Ctrl-C, run_round attend la fin des comptes en cours avant de propager l'interruption
+        deferred, untried = run_round(items, results, login_slots, breakers, worker_count, journal, state_store, emitter)
+
+        retries = []
+        for index, account, attempt, step, error in deferred:
+            last_failure[index] = step
+            if attempt >= RETRY_MAX_ATTEMPTS:
+                ERROR(f"Giving up on account {account['AccountName']} after {attempt} attempt(s): {error}")
+                results[index] = [failure_row(account, attempt, step, error)]
+            else:
+                retries.append((index, account, attempt + 1))
+        if emitter is not None:
+            emitter.emit_ready()
+
+        if STOP_EVENT.is_set():
+            break
+        # Aucun worker n'a pu démarrer (connexion en échec) : on réessaie, mais pas indéfiniment
+        stalled_rounds = stalled_rounds + 1 if len(untried) == len(items) else 0
+        if stalled_rounds >= RETRY_MAX_ATTEMPTS:
+            break
+        succeeded = len(items) - len(deferred) - len(untried)
+        backoff_level = 0 if succeeded else backoff_level + 1
+
+        items = sorted(untried + retries + held, key=lambda item: item[0])
+        if items:
+            delay = retry_delay(backoff_level)
+            WARNING(f"{len(items)} account(s) pending, next round in {delay:.0f}s")
+            if STOP_EVENT.wait(delay):
+                break
 
-            except Exception as e:
-                logging.error(f"Error processing expiration date for {row[0]}: {e}")
+    if emitter is not None:
+        emitter.emit_ready(total=len(accounts))
 
-    workbook.save(report_filename)
+    missing = [str(accounts[index]['AccountName']) for index in range(len(accounts)) if index not in results]
+    if missing:
+        ERROR(f"{len(missing)} account(s) not processed (no worker left): {', '.join(missing)}")
 
-    return report_filename  # Return the filename to be used later
+    report_data = []
+    for index in sorted(results):
+        report_data.extend(results[index])
+    return report_data
 
-def main():
-    # Lire les comptes depuis le fichier Excel
-    accounts = read_accounts_from_excel(EXCEL_FILE_PATH)
+def export_run_metrics(report_writer=None):
+    """Exporte les spans et la mémoire des navigateurs : trace JSON, textfile Prometheus et feuilles de synthèse du rapport."""
+    if not SPANS:
+        return
+    try:
+        if report_writer is not None:
+            report_writer.write_summary(SUMMARY_HEADERS, summary_rows())
+            if MEMORY_SAMPLES:
+                report_writer.write_summary(MEMORY_HEADERS, memory_rows(), "Browser Memory")
+        write_trace(TRACE_PATH_TEMPLATE.format(datetime.now().strftime('%Y%m%d_%H%M%S')))
+        write_prometheus_metrics(METRICS_PATH)
+    except OSError as e:
+        logging.error(f"Could not export run metrics: {e}")
+    for step, stats in summarize_spans().items():
+        INFO(f"[trace] {step}: {stats['count']} x, p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s, "
+             f"total {stats['total']:.1f}s, {stats['round_trips']} WebDriver round-trips, {stats['failures']} failure(s)")
+    memory = summarize_memory()
+    if memory['samples']:
+        INFO(f"[memory] peak browser RSS {memory['peak_rss_mb'] if memory['peak_rss_mb'] is not None else 'n/a'} MiB, "
+             f"{memory['recycles']} recycle(s) ({memory['relogins']} with re-login), first accounts "
+             f"{memory['first_accounts_mean_s']:.1f}s vs last accounts {memory['last_accounts_mean_s']:.1f}s per account")
+
+class SecretDaemon:
+    """Service : un navigateur connecté par région, et des vérifications planifiées d'après les expirations connues.
+
+    Chaque ClientID est revérifié quand sa clé entre dans la fenêtre de
+    renouvellement, ou quand son état a plus de ``STATE_MAX_AGE_DAYS`` jours.
+    L'état de chaque ClientID (expiration, dernière et prochaine vérification,
+    dernier statut) est gardé en mémoire pour l'API. Les clés secrètes n'y
+    figurent jamais : les lignes des renouvellements, clés comprises, sont
+    écrites dans ``journal`` avant la mise à jour de l'état.
+    """
+
+    def __init__(self, accounts, state_store, journal):
+        self.accounts = {account['ClientID']: account for account in accounts}
+        self.state_store = state_store
+        self.journal = journal
+        self.status = {}
+        self.drivers = {}
+        self.schedule = []  # tas de (échéance, numéro, ClientID, renouvellement forcé)
+        self.tokens = {}  # ClientID -> numéro de la seule entrée valide du tas
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.login_slots = threading.BoundedSemaphore(max(1, MAX_CONCURRENT_LOGINS))
+        known = state_store.get_all()
+        for client_id, account in self.accounts.items():
+            expiration_date, checked_at = known.get(client_id, (None, None))
+            self.status[client_id] = {
+                'account': account['AccountName'],
+                'client_id': client_id,
+                'region': account_region(account),
+                'expiration_date': expiration_date,
+                'checked_at': checked_at,
+                'last_status': None,
+                'next_check': None,
+                'failures': 0,
+            }
+            self.schedule_check(client_id, self.next_check_at(expiration_date, checked_at))
+
+    @staticmethod
+    def next_check_at(expiration_date, checked_at):
+        """Entrée dans la fenêtre de renouvellement ou vieillissement de l'état.
+
+        Jamais avant ``DAEMON_MIN_RECHECK_MINUTES`` après la dernière vérification :
+        une clé restée dans la fenêtre (renouvellement en échec) n'est pas revérifiée en boucle.
+        """
+        now = datetime.now()
+        try:
+            checked = datetime.fromisoformat(checked_at)
+        except (TypeError, ValueError):
+            return now  # Jamais vérifié
+        earliest = max(now, checked + timedelta(minutes=DAEMON_MIN_RECHECK_MINUTES))
+        try:
+            renewal_due = datetime.fromisoformat(expiration_date[:10]) - timedelta(days=RENEWAL_THRESHOLD_DAYS)
+        except (TypeError, ValueError):
+            return earliest  # Expiration inconnue (compte ou application introuvable, date illisible)
+        stale = checked + timedelta(days=STATE_MAX_AGE_DAYS)
+        return max(earliest, min(renewal_due, stale))
+
+    def schedule_check(self, client_id, when, force_renewal=False):
+        """(Re)planifie la vérification d'un ClientID ; remplace la vérification déjà planifiée."""
+        with self.condition:
+            token = next(self.sequence)
+            self.tokens[client_id] = token
+            heapq.heappush(self.schedule, (when, token, client_id, force_renewal))
+            self.status[client_id]['next_check'] = when.isoformat(timespec='seconds')
+            self.condition.notify()
+
+    def snapshot(self, client_id=None):
+        """État exposé par l'API : un ClientID, ou tous."""
+        with self.condition:
+            entries = [self.status[client_id]] if client_id else list(self.status.values())
+            snapshot = []
+            for entry in entries:
+                days = days_until(entry['expiration_date'])
+                snapshot.append({**entry, 'days_until_expiration': days,
+                                 'fresh': days is not None and days >= RENEWAL_THRESHOLD_DAYS})
+        return snapshot[0] if client_id else snapshot
+
+    def driver_for(self, region):
+        driver = self.drivers.get(region)
+        if driver is None:
+            driver = self.drivers[region] = start_browser(f"daemon-{region}", self.login_slots, region)
+        return driver
 
-    if not accounts:
-        logging.error("Aucun compte trouvé dans le fichier Excel.")
+    def discard_driver(self, region):
+        driver = self.drivers.pop(region, None)
+        if driver is not None:
+            quit_driver(driver)
+
+    def next_due(self):
+        """Attend la prochaine vérification due ; retourne (ClientID, renouvellement forcé) ou None à l'arrêt."""
+        with self.condition:
+            while not STOP_EVENT.is_set():
+                while self.schedule and self.schedule[0][1] != self.tokens.get(self.schedule[0][2]):
+                    heapq.heappop(self.schedule)  # Entrée remplacée par une planification plus récente
+                if self.schedule and self.schedule[0][0] <= datetime.now():
+                    _, _, client_id, force_renewal = heapq.heappop(self.schedule)
+                    self.status[client_id]['next_check'] = None
+                    return client_id, force_renewal
+                timeout = (self.schedule[0][0] - datetime.now()).total_seconds() if self.schedule else 1
+                self.condition.wait(min(max(timeout, 0.1), 1))  # Réveil régulier pour voir STOP_EVENT
+        return None
+
+    def check(self, client_id, force_renewal=False):
+        account = self.accounts[client_id]
+        region = account_region(account)
+        _trace_context.account = account['AccountName']
+        try:
+            driver = self.driver_for(region)
+            started = time.monotonic()
+            rows = process_account(driver, account, force_renewal=force_renewal)
+        except TransientError as e:
+            self.defer(client_id, force_renewal, f"Deferred: {e}")
+            if isinstance(e, SessionLostError) and region in self.drivers:
+                try:
+                    with self.login_slots:
+                        ensure_logged_in(self.drivers[region])
+                except Exception as login_error:
+                    ERROR(f"[daemon] Re-login failed for {region}: {login_error}")
+                    self.discard_driver(region)
+            return
+        except (WebDriverException, SystemExit) as e:
+            ERROR(f"[daemon] Browser lost for {region} while checking {account['AccountName']}: {e}")
+            self.discard_driver(region)
+            self.defer(client_id, force_renewal, f"Deferred: browser lost ({type(e).__name__})")
+            return
+        except Exception as e:
+            ERROR(f"[daemon] Check failed for {account['AccountName']}: {e}")
+            with self.condition:
+                self.status[client_id]['last_status'] = f"Failed: {e}"
+            self.schedule_check(client_id, datetime.now() + timedelta(days=1))
+            return
+
+        if any(str(row[8]).startswith('Renew') for row in rows):
+            # Une clé renouvelée ne se relit plus qu'à la console : l'écrire avant tout le reste
+            self.journal.record(account, rows)
+        self.state_store.record(account, rows)
+        reason = recycle_reason(driver, sample_browser(driver, account['AccountName'], time.monotonic() - started))
+        if reason:
+            try:
+                self.drivers[region] = recycle_browser(self.drivers.pop(region), f"daemon-{region}", self.login_slots, reason)
+            except (Exception, SystemExit) as e:
+                ERROR(f"[daemon] Could not recycle the {region} browser, restarting it on the next check: {e}")
+        checked_at = datetime.now().isoformat(timespec='seconds')
+        with self.condition:
+            status = self.status[client_id]
+            status['checked_at'] = checked_at
+            status['failures'] = 0
+            if rows:
+                row = rows[-1]
+                status['expiration_date'] = row[6] if row[6] not in (None, 'N/A') else row[3]
+                status['last_status'] = row[8]
+            else:
+                status['last_status'] = "Account or application not found"
+            expiration_date = status['expiration_date']
+        INFO(f"[daemon] {account['AccountName']}: {status['last_status']} (expires {expiration_date})")
+        self.schedule_check(client_id, self.next_check_at(expiration_date, checked_at))
+
+    def defer(self, client_id, force_renewal, message):
+        with self.condition:
+            status = self.status[client_id]
+            status['last_status'] = message
+            status['failures'] += 1
+            level = status['failures'] - 1
+        WARNING(f"[daemon] {status['account']}: {message}")
+        self.schedule_check(client_id, datetime.now() + timedelta(seconds=retry_delay(level)), force_renewal)
+
+    def run(self):
+        """Boucle du service : préchauffe un navigateur par région puis exécute les vérifications à échéance."""
+        for region in sorted({account_region(account) for account in self.accounts.values()}):
+            try:
+                self.driver_for(region)
+            except (Exception, SystemExit) as e:
+                ERROR(f"[daemon] Could not start the {region} browser, retrying on the next check: {e}")
+        while True:
+            due = self.next_due()
+            if due is None:
+                return
+            self.check(*due)
+
+    def close(self):
+        for region in list(self.drivers):
+            self.discard_driver(region)
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """API locale du service.
+
+    GET /health, GET /status, GET /status/<ClientID> ;
+    POST /check/<ClientID> et POST /renew/<ClientID> (jeton ``DAEMON_TOKEN`` obligatoire).
+
+    Une requête POST portant un en-tête ``Origin`` vient d'une page web ouverte
+    dans un navigateur, pas d'un client local : elle est refusée.
+    """
+    server_version = 'SecretKeyDaemon/1.0'
+
+    def log_message(self, format, *args):
+        logging.debug(f"[daemon api] {format % args}")
+
+    def send_json(self, status, data):
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def route(self):
+        parts = [unquote(part) for part in urlparse(self.path).path.strip('/').split('/') if part]
+        return parts + [None] * (2 - len(parts))
+
+    def do_GET(self):
+        service = self.server.service
+        action, client_id = self.route()[:2]
+        if action == 'health':
+            return self.send_json(200, {'status': 'ok', 'accounts': len(service.accounts), 'browsers': sorted(service.drivers)})
+        if action == 'status' and client_id is None:
+            return self.send_json(200, service.snapshot())
+        if action == 'status' and client_id in service.accounts:
+            return self.send_json(200, service.snapshot(client_id))
+        return self.send_json(404, {'error': 'unknown ClientID' if action == 'status' else 'not found'})
+
+    def do_POST(self):
+        service = self.server.service
+        if self.headers.get('Origin') is not None:
+            return self.send_json(403, {'error': 'cross-origin requests are not allowed'})
+        if not DAEMON_TOKEN:
+            return self.send_json(403, {'error': 'POST routes disabled: DAEMON_TOKEN is not set'})
+        if not hmac.compare_digest(self.headers.get('Authorization', ''), f"Bearer {DAEMON_TOKEN}"):
+            return self.send_json(401, {'error': 'invalid or missing token'})
+        action, client_id = self.route()[:2]
+        if action not in ('check', 'renew'):
+            return self.send_json(404, {'error': 'not found'})
+        if action == 'renew' and AUDIT_ONLY:
+            return self.send_json(409, {'error': 'renewals disabled (audit only)'})
+        if client_id not in service.accounts:
+            return self.send_json(404, {'error': 'unknown ClientID'})
+        service.schedule_check(client_id, datetime.now(), force_renewal=action == 'renew')
+        INFO(f"[daemon api] {action} requested for {client_id}")
+        return self.send_json(202, service.snapshot(client_id))
+
+def run_daemon(accounts):
+    """Mode service : API locale + vérifications planifiées, jusqu'à Ctrl-C."""
+    state_store = StateStore(STATE_DB_PATH)
+    journal = CheckpointJournal(DAEMON_JOURNAL_PATH, include_secrets=True)
+    INFO(f"Daemon renewals (with secrets) are journaled to {DAEMON_JOURNAL_PATH}")
+    service = SecretDaemon(accounts, state_store, journal)
+    server = ThreadingHTTPServer((DAEMON_HOST, DAEMON_PORT), DaemonRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    threading.Thread(target=server.serve_forever, name='daemon-api', daemon=True).start()
+    INFO(f"Daemon started: {len(accounts)} account(s), API on http://{DAEMON_HOST}:{DAEMON_PORT}")
+    if not DAEMON_TOKEN:
+        WARNING("DAEMON_TOKEN is not set: POST /check and /renew are disabled, only scheduled checks run.")
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        INFO("Stopping daemon...")
+    finally:
+        STOP_EVENT.set()
+        server.shutdown()
+        service.close()
+        journal.close()
+        state_store.close()
+        export_run_metrics()
+
+def benchmark_profiles(repeats=3):
+    """Compare les temps de chargement des pages Vendor Central entre les profils 'standard' et 'lean'."""
+    urls = [
+        f"{VENDOR_CENTRAL_URL}{ACCOUNT_SWITCHER_PATH}",
+        f"{VENDOR_CENTRAL_URL}{DEVELOPER_CONSOLE_PATH}",
+    ]
+    results = {}
+    for profile in ('standard', 'lean'):
+        driver = setup_driver(profile)
+        try:
+            ensure_logged_in(driver)
+            timings = []
+            for _ in range(repeats):
+                for url in urls:
+                    start = time.monotonic()
+                    driver.get(url)
+                    timings.append(time.monotonic() - start)
+            results[profile] = timings
+        finally:
+            quit_driver(driver)
+
+    for profile, timings in results.items():
+        INFO(f"[benchmark] {profile}: {len(timings)} page loads, "
+             f"mean {statistics.mean(timings):.2f}s, median {statistics.median(timings):.2f}s, max {max(timings):.2f}s")
+    if len(results) == 2:
+        gain = statistics.mean(results['standard']) - statistics.mean(results['lean'])
+        INFO(f"[benchmark] lean profile saves {gain:.2f}s per page load on average")
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Vérifie et renouvelle les clés secrètes des applications Vendor Central.")
+    parser.add_argument('--benchmark-profiles', action='store_true',
+                        help="compare les temps de chargement des profils navigateur 'standard' et 'lean' puis quitte")
+    parser.add_argument('--resume', action='store_true',
+                        help="reprend l'exécution précédente en sautant les comptes déjà terminés dans le journal")
+    parser.add_argument('--check-all', action='store_true',
+                        help="vérifie tous les comptes, sans tenir compte des expirations connues dans la base locale")
+    parser.add_argument('--daemon', action='store_true',
+                        help="mode service : garde un navigateur connecté, vérifie les clés à échéance et expose une API HTTP locale")
+    parser.add_argument('--report-from-journal', action='store_true',
+                        help="génère le rapport Excel à partir du journal seul, sans navigateur, puis quitte")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="affiche les comptes qui seraient vérifiés ou sautés, sans navigateur ni rapport, puis quitte")
+    parser.add_argument('--audit-only', action='store_true',
+                        help="lit les expirations sans jamais renouveler de clé (AUDIT_ONLY=1)")
+    parser.add_argument('--accounts', nargs='+', metavar='NOM',
+                        help="ne traite que ces comptes (nom exact ou motif avec *, sans tenir compte de la casse)")
+    parser.add_argument('--client-id', nargs='+', metavar='CLIENT_ID', help="ne traite que ces ClientID")
+    parser.add_argument('--limit', type=int, metavar='N', help="ne traite que les N premiers comptes retenus")
+    return parser.parse_args(argv)
+
+def account_name_matches(name, pattern):
+    """Nom exact, ou motif si ``pattern`` contient ``*`` : seul ``*`` est un joker, ``[``, ``]`` et ``?`` restent littéraux."""
+    if name == pattern:
+        return True
+    if '*' not in pattern:
+        return False
+    return fnmatch.fnmatchcase(name, pattern.replace('[', '[[]').replace('?', '[?]'))
+
+def filter_accounts(accounts, names=None, client_ids=None, limit=None):
+    """Comptes retenus par --accounts, --client-id et --limit, dans l'ordre du fichier."""
+    if names:
+        patterns = [normalize_account_name(name) for name in names]
+        accounts = [account for account in accounts
+                    if any(account_name_matches(normalize_account_name(account['AccountName']), pattern) for pattern in patterns)]
+    if client_ids:
+        wanted = {client_id.strip() for client_id in client_ids}
+        accounts = [account for account in accounts if account['ClientID'] in wanted]
+    if limit is not None:
+        accounts = accounts[:max(0, limit)]
+    return accounts
+
+def print_plan(accounts, skipped, state_store):
+    """Plan de --dry-run : une ligne par compte, avec la dernière expiration connue et l'action prévue."""
+    known = state_store.get_all()
+    print(f"{'Action':<22}{'Region':<8}{'Expires':<12}{'Days':>6}  Account (ClientID)")
+    for account in accounts:
+        expiration_date, _checked_at = known.get(account['ClientID'], (None, None))
+        days = days_until(expiration_date)
+        if journal_key(account) in skipped:
+            action = "skip"
+        elif days is not None and days < RENEWAL_THRESHOLD_DAYS:
+            action = "check (audit only)" if AUDIT_ONLY else "check + renew"
+        else:
+            action = "check"
+        print(f"{action:<22}{account_region(account):<8}{(expiration_date or '-')[:10]:<12}{'-' if days is None else days:>6}  "
+              f"{account['AccountName']} ({account['ClientID']})")
+    print(f"{len(accounts) - len(skipped)} account(s) to check, {len(skipped)} skipped")
+
+def main(argv=None):
+    global AUDIT_ONLY
+    args = parse_args(argv)
+    AUDIT_ONLY = AUDIT_ONLY or args.audit_only
+    if args.benchmark_profiles:
+        benchmark_profiles()
         return
 
-    # Initialiser le WebDriver
-    driver = setup_driver()
+    if args.report_from_journal:
+        report_data = rows_from_journal(JOURNAL_PATH)
+        if report_data:
+            logging.info(f"Report generated from journal: {create_report(report_data)}")
+        else:
+            logging.warning(f"No data in journal {JOURNAL_PATH}.")
+        return
 
+    # Lire les comptes depuis le fichier Excel
     try:
-        # Se connecter à Amazon
-        login_to_amazon(driver)
+        accounts = read_accounts_from_excel(EXCEL_FILE_PATH)
+    except Exception as e:
+        logging.error(f"Error reading Excel file: {e}")
+        return
 
-        report_data = []  # Liste pour stocker les données du rapport
+    if not accounts:
+        logging.error("Aucun compte trouvé dans le fichier Excel.")
+        return
 
-        for account in accounts:
-            account_name = account['AccountName']
-            target_client_id = account['ClientID']
+    if args.accounts or args.client_id or args.limit is not None:
+        accounts = filter_accounts(accounts, args.accounts, args.client_id, args.limit)
+        INFO(f"{len(accounts)} account(s) selected by the command-line filters")
+        if not accounts:
+            logging.error("No account matches --accounts / --client-id.")
+            return
+    if AUDIT_ONLY:
+        INFO("Audit only: expirations are read, no secret will be renewed")
 
-            logging.info(f"Processing account: {account_name} (Client ID: {target_client_id})")
+    if args.dry_run:
+        state_store = StateStore(STATE_DB_PATH)
+        try:
+            skipped = {} if args.check_all else plan_accounts(accounts, state_store)
+            print_plan(accounts, skipped, state_store)
+        finally:
+            state_store.close()
+        return
 
-            # Sélectionner le compte du client
-            select_client_account(driver, account_name)
+    if args.daemon:
+        run_daemon(accounts)
+        return
 
-            # Vérifier s'il y a une alerte sur le profil développeur
-            if check_developer_profile_alert(driver):
-                logging.warning("Developer profile alert detected. Handling the alert.")
-                # Ici, vous pouvez ajouter le code pour gérer l'alerte si nécessaire.
+    completed = {}
+    if args.resume:
+        completed = {key: journal_rows(entry) for key, entry in load_journal(JOURNAL_PATH).items()}
+        INFO(f"Resuming: {sum(journal_key(account) in completed for account in accounts)} account(s) already completed in {JOURNAL_PATH}")
 
-            # Trouver l'application par son Client ID
-            if find_application_by_client_id(driver, target_client_id):
-                # Extraire la clé secrète et la date d'expiration
-                client_secret, expiration_date = extract_secret_key_and_expiration(driver)
+    state_store = StateStore(STATE_DB_PATH)
+    if not args.check_all:
+        # Sauter sans navigateur les comptes dont la clé expire bien après l'horizon
+        skipped = plan_accounts([account for account in accounts if journal_key(account) not in completed], state_store)
+        completed.update(skipped)
 
-                if client_secret is None or expiration_date is None:
-                    logging.warning(f"Skipping account {account_name}, missing key or expiration date.")
-                    continue
+    journal = open_journal(args.resume)
+    report_writer = ReportWriter()
+    try:
+        # Traiter les comptes avec le pool de navigateurs ; le rapport est écrit au fil de l'eau
+        report_data = process_accounts(accounts, journal=journal, completed=completed,
+                                       state_store=state_store, report_writer=report_writer)
 
-                # Calculer les jours restants avant expiration
-                days_until_expiration = (datetime.fromisoformat(expiration_date) - datetime.now()).days if expiration_date else None
-                logging.info(f"Days until expiration: {days_until_expiration} for {account_name}")
-
-                # Si la date d'expiration est inférieure à 30 jours, renouveler la clé
-                if days_until_expiration and days_until_expiration < 30:
-                    logging.info(f"Renewing secret for account: {account_name}")
-                    new_client_secret, new_expiration_date = renew_secret_and_extract(driver, account_name, report_data)
-                    report_data.append([account_name,target_client_id, client_secret, expiration_date, days_until_expiration, new_client_secret, new_expiration_date, days_until_expiration, "Renewed successfully"])
-                else:
-                    report_data.append([account_name, target_client_id, client_secret, expiration_date, days_until_expiration, "N/A", "N/A", "N/A", "No renewal needed"])
-            else:
-                logging.warning(f"No application found for ClientID: {target_client_id} in account {account_name}")
+        if FAST_MODE:
+            report_wait_savings()
 
-        # Générer le rapport avec les données collectées
-        if report_data:
-            report_filename = create_report(report_data)
-            logging.info(f"Report generated: {report_filename}")
-        else:
+        if not report_data:
             logging.warning("No data to report.")
 
+    except KeyboardInterrupt:
+        logging.error(f"Run interrupted. Completed accounts are saved in {JOURNAL_PATH}; rerun with --resume to continue.")
     except Exception as e:
         logging.error(f"An error occurred during the process: {e}")
     finally:
-        # Fermer le driver
-        driver.quit()
+        export_run_metrics(report_writer)
+        for report_filename in report_writer.close():
+            logging.info(f"Report generated: {report_filename}")
+        journal.close()
+        state_store.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Tests de SecretDaemon.next_check_at : planification des vérifications du mode service.
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+os.environ.setdefault('REPORT_PATH', tempfile.mkdtemp(prefix='tests_'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clientSecret  # noqa: E402
+from clientSecret import SecretDaemon  # noqa: E402
+
+SETTINGS = {'DAEMON_MIN_RECHECK_MINUTES': 60, 'RENEWAL_THRESHOLD_DAYS': 30, 'STATE_MAX_AGE_DAYS': 7}
+
+
+class NextCheckAtTest(unittest.TestCase):
+
+    def setUp(self):
+        for name, value in SETTINGS.items():
+            patcher = mock.patch.object(clientSecret, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def assertAround(self, actual, expected):
+        self.assertLess(abs((actual - expected).total_seconds()), 5, f"{actual} != {expected}")
+
+    def next_check(self, expiration, checked):
+        return SecretDaemon.next_check_at(expiration and expiration.strftime('%Y-%m-%d'),
+                                          checked and checked.isoformat(timespec='seconds'))
+
+    def test_never_checked(self):
+        self.assertAround(SecretDaemon.next_check_at(None, None), datetime.now())
+        self.assertAround(SecretDaemon.next_check_at('2027-01-05', 'not a date'), datetime.now())
+
+    def test_unknown_expiration_keeps_the_recheck_floor(self):
+        now = datetime.now()
+        self.assertAround(self.next_check(None, now), now + timedelta(minutes=60))
+        self.assertAround(SecretDaemon.next_check_at('unreadable', now.isoformat(timespec='seconds')),
+                          now + timedelta(minutes=60))
+
+    def test_unknown_expiration_checked_long_ago(self):
+        self.assertAround(self.next_check(None, datetime.now() - timedelta(days=2)), datetime.now())
+
+    def test_stale_state(self):
+        now = datetime.now()
+        self.assertAround(self.next_check(now + timedelta(days=100), now), now + timedelta(days=7))
+
+    def test_entering_the_renewal_window(self):
+        now = datetime.now()
+        expiration = now + timedelta(days=35)
+        due = datetime.fromisoformat(expiration.strftime('%Y-%m-%d')) - timedelta(days=30)
+        self.assertAround(self.next_check(expiration, now), due)
+
+    def test_key_already_in_the_window(self):
+        checked = datetime.now() - timedelta(minutes=10)
+        self.assertAround(self.next_check(datetime.now() + timedelta(days=10), checked), checked + timedelta(minutes=60))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Tests de filter_accounts et account_name_matches : sélection des comptes par --accounts, --client-id et --limit.
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault('REPORT_PATH', tempfile.mkdtemp(prefix='tests_'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clientSecret import account_name_matches, filter_accounts  # noqa: E402
+
+ACCOUNTS = [
+    {'AccountName': 'FR - Foo [x]', 'ClientID': 'id-1'},
+    {'AccountName': 'FR - Foo x', 'ClientID': 'id-2'},
+    {'AccountName': 'DE - Bar?', 'ClientID': 'id-3'},
+    {'AccountName': 'DE - Bar1', 'ClientID': 'id-4'},
+]
+
+
+def names(accounts):
+    return [account['AccountName'] for account in accounts]
+
+
+class AccountNameMatchesTest(unittest.TestCase):
+
+    def test_exact(self):
+        self.assertTrue(account_name_matches('fr - foo [x]', 'fr - foo [x]'))
+        self.assertFalse(account_name_matches('fr - foo', 'fr - fo'))
+
+    def test_only_star_is_a_wildcard(self):
+        self.assertTrue(account_name_matches('fr - foo [x]', 'fr - *[x]'))
+        self.assertFalse(account_name_matches('fr - foo x', 'fr - foo [x]*'))
+        self.assertFalse(account_name_matches('de - bar1', 'de - bar?'))
+        self.assertFalse(account_name_matches('de - bar1', 'de - bar?*'))
+
+
+class FilterAccountsTest(unittest.TestCase):
+
+    def test_names_with_brackets_and_question_marks(self):
+        self.assertEqual(names(filter_accounts(ACCOUNTS, ['FR - Foo [x]'])), ['FR - Foo [x]'])
+        self.assertEqual(names(filter_accounts(ACCOUNTS, ['de - bar?'])), ['DE - Bar?'])
+
+    def test_pattern_keeps_file_order(self):
+        self.assertEqual(names(filter_accounts(ACCOUNTS, ['DE - *', 'FR - Foo x'])), ['FR - Foo x', 'DE - Bar?', 'DE - Bar1'])
+
+    def test_client_ids_and_limit(self):
+        self.assertEqual(names(filter_accounts(ACCOUNTS, client_ids=[' id-3', 'id-1'])), ['FR - Foo [x]', 'DE - Bar?'])
+        self.assertEqual(names(filter_accounts(ACCOUNTS, ['*'], limit=2)), ['FR - Foo [x]', 'FR - Foo x'])
+        self.assertEqual(filter_accounts(ACCOUNTS, limit=-1), [])
+
+    def test_no_match(self):
+        self.assertEqual(filter_accounts(ACCOUNTS, ['FR - Foo']), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
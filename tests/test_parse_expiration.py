@@ -0,0 +1,76 @@
+"""Tests de parse_expiration_date : formats reconnus du texte d'expiration du modal.
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault('REPORT_PATH', tempfile.mkdtemp(prefix='tests_'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clientSecret import month_from_name, parse_expiration_date  # noqa: E402
+
+
+class ParseExpirationDateTest(unittest.TestCase):
+
+    def test_iso(self):
+        self.assertEqual(parse_expiration_date('2027-01-05'), '2027-01-05')
+        self.assertEqual(parse_expiration_date('Expires 2027-01-05T10:30:00Z'), '2027-01-05')
+
+    def test_year_first_with_slashes(self):
+        self.assertEqual(parse_expiration_date('2027/01/05'), '2027-01-05')
+
+    def test_day_first(self):
+        self.assertEqual(parse_expiration_date('Expire le 05/01/2027'), '2027-01-05')
+        self.assertEqual(parse_expiration_date('05.01.2027', 'de'), '2027-01-05')
+
+    def test_month_first_for_us_english(self):
+        self.assertEqual(parse_expiration_date('01/05/2027', 'en-US'), '2027-01-05')
+
+    def test_month_first_when_day_can_only_be_second(self):
+        self.assertEqual(parse_expiration_date('01/25/2027'), '2027-01-25')
+
+    def test_written_dates(self):
+        cases = {
+            '5 janvier 2027': '2027-01-05',
+            '1er janvier 2027': '2027-01-01',
+            'January 5, 2027': '2027-01-05',
+            'January 5th, 2027': '2027-01-05',
+            '5. Dez. 2027': '2027-12-05',
+            '5 de enero de 2027': '2027-01-05',
+            '5 gennaio 2027': '2027-01-05',
+            '5 stycznia 2027': '2027-01-05',
+            '5 februari 2027': '2027-02-05',
+            '17 août 2027': '2027-08-17',
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_expiration_date(text), expected)
+
+    def test_day_is_taken_next_to_the_month(self):
+        self.assertEqual(parse_expiration_date('Expires in 30 days: 5 January 2027'), '2027-01-05')
+        self.assertEqual(parse_expiration_date('It may expire on 12 May 2027'), '2027-05-12')
+
+    def test_weekday_is_not_a_month(self):
+        self.assertEqual(parse_expiration_date('mar. 5 janv. 2027'), '2027-01-05')  # « mar. » : mardi, pas mars
+        self.assertEqual(parse_expiration_date('mar 5 gen 2027'), '2027-01-05')
+        self.assertEqual(parse_expiration_date('mar, 5 de enero de 2027'), '2027-01-05')
+
+    def test_unreadable(self):
+        self.assertIsNone(parse_expiration_date(''))
+        self.assertIsNone(parse_expiration_date(None))
+        self.assertIsNone(parse_expiration_date('December 2027'))
+        self.assertIsNone(parse_expiration_date('31/02/2027'))
+
+    def test_month_from_name(self):
+        self.assertEqual(month_from_name('janv.'), 1)
+        self.assertEqual(month_from_name('juil.'), 7)
+        self.assertEqual(month_from_name('dez'), 12)
+        self.assertIsNone(month_from_name('jui'))  # Juin ou juillet
+        self.assertIsNone(month_from_name('ma'))  # Trop court
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+"""Tests de percentile : percentile par rang le plus proche des synthèses de trace.
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault('REPORT_PATH', tempfile.mkdtemp(prefix='tests_'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clientSecret import percentile  # noqa: E402
+
+
+class PercentileTest(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        self.assertEqual(percentile(range(1, 21), 0.95), 19)
+        self.assertEqual(percentile(range(1, 101), 0.95), 95)
+        self.assertEqual(percentile(range(1, 11), 0.5), 5)
+        self.assertEqual(percentile(range(1, 12), 0.5), 6)
+
+    def test_unsorted_values(self):
+        self.assertEqual(percentile([3.0, 1.0, 2.0, 5.0, 4.0], 0.5), 3.0)
+
+    def test_bounds(self):
+        self.assertEqual(percentile([7], 0.95), 7)
+        self.assertEqual(percentile(range(1, 21), 0), 1)
+        self.assertEqual(percentile(range(1, 21), 1), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
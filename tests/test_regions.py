@@ -0,0 +1,52 @@
+"""Tests de la répartition par région : derive_region et allocate_workers.
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ.setdefault('REPORT_PATH', tempfile.mkdtemp(prefix='tests_'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clientSecret  # noqa: E402
+from clientSecret import allocate_workers, derive_region  # noqa: E402
+
+
+class DeriveRegionTest(unittest.TestCase):
+
+    def test_region_column_wins(self):
+        self.assertEqual(derive_region('FR - Foo', 'BE_Foo', ' de '), 'DE')
+
+    def test_default_region_without_column(self):
+        with mock.patch.object(clientSecret, 'REGION_FROM_NAME', False):
+            self.assertEqual(derive_region('BE - Foo', 'BE_Foo'), clientSecret.DEFAULT_REGION)
+
+    def test_name_prefix_when_enabled(self):
+        with mock.patch.object(clientSecret, 'REGION_FROM_NAME', True):
+            self.assertEqual(derive_region('be - Foo'), 'BE')
+            self.assertEqual(derive_region('Foo', 'IT_Foo'), 'IT')
+            self.assertEqual(derive_region('Foo', 'Foo'), clientSecret.DEFAULT_REGION)
+
+
+class AllocateWorkersTest(unittest.TestCase):
+
+    def test_never_exceeds_budget(self):
+        counts = {'FR': 100, 'DE': 50, 'IT': 10, 'ES': 3}
+        for budget in range(4, 12):
+            with self.subTest(budget=budget):
+                self.assertLessEqual(sum(allocate_workers(counts, budget).values()), budget)
+
+    def test_one_worker_per_region_then_by_load(self):
+        self.assertEqual(allocate_workers({'FR': 100, 'DE': 50, 'IT': 10, 'ES': 3}, 4),
+                         {'FR': 1, 'DE': 1, 'IT': 1, 'ES': 1})
+        self.assertEqual(allocate_workers({'FR': 90, 'DE': 30}, 4), {'FR': 3, 'DE': 1})
+
+    def test_no_more_workers_than_accounts(self):
+        self.assertEqual(allocate_workers({'FR': 2, 'DE': 1}, 8), {'FR': 2, 'DE': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()